@@ -1,17 +1,55 @@
 from player_divercite import PlayerDivercite
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
-from game_state_divercite import GameStateDivercite
+from game_state_divercite import N_CELLS, PIECE_IS_CITY, GameStateDivercite, decode_move
 from seahorse.utils.custom_exceptions import MethodNotImplementedError
 
 from seahorse.game.heavy_action import HeavyAction
 from seahorse.game.light_action import LightAction
 from seahorse.game.game_layout.board import Piece
 from game_state_divercite import BoardDivercite
+from board_config import BOARD_CONFIG
+from heuristic_weights import HeuristicWeights
+from city_tables import CityTables
+from table_cache import source_version
+from tt_snapshot import TTSnapshot, snapshot_key
+from shared_tt import SharedTranspositionTable
+from probcut import ProbCut
+from move_swing import swing_score
+from loguru import logger
+
+
+import hashlib, inspect, math, os, random, time
+
+# Flags of the transposition table entries: exact value, lower bound (fail high) and upper bound (fail low)
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+# Only the nodes searched this deep or more are stored, the leaves are only evaluated
+TT_MIN_DEPTH = 1
+# The snapshot written at the end of a game only keeps the deeper nodes, at most TT_SNAPSHOT_MAX_ENTRIES
+TT_SNAPSHOT_MIN_DEPTH = 3
+TT_SNAPSHOT_MAX_ENTRIES = 1 << 20
+# The rest of the game is solved exactly (win or loss) when this many steps are left, within ENDGAME_NODE_LIMIT nodes,
+# or within ENDGAME_BUDGET_SHARE of the node budget, so that the search has the rest if the solver fails
+ENDGAME_STEPS = 8
+ENDGAME_NODE_LIMIT = 200000
+ENDGAME_BUDGET_SHARE = 0.5
+# With less than LOW_TIME seconds left, the search drops to depth 3 and the solver searches at most
+# ENDGAME_LOW_TIME_NODES nodes per second left (about 4% of the time at 13k solver nodes/s)
+LOW_TIME = 100
+ENDGAME_LOW_TIME_NODES = 500
+# The final score bounds are only computed with this many steps left or more, closer to the end the
+# positions are cheaper to search than to bound. Only the endgame solver uses them: alpha-beta compares heuristic
+# values, which are not on the scale of the scores, so a score bound cannot be compared to its window. A bound
+# deciding the winner only matters in the solver window, where the solver searches first.
+ENDGAME_BOUNDS_STEPS = 4
+
+
+class SearchBudgetExhausted(Exception):
+    """
+    Raised by the search when the node budget of the move is spent.
+    """
 
 
-import math, random
-
 class MyPlayer(PlayerDivercite):
     """
     Player class for Divercite game that makes random moves.
@@ -20,16 +58,118 @@ class MyPlayer(PlayerDivercite):
         piece_type (str): piece type of the player
     """
 
-    def __init__(self, piece_type: str, name: str = "MyPlayer"):
+    def __init__(self, piece_type: str, name: str = "MyPlayer", weights: HeuristicWeights = None, evaluation: str = "table",
+                 node_budget: int = None, tt_snapshot_dir: str = None, shared_tt: str = None, probcut: ProbCut = None):
         """
         Initialize the PlayerDivercite instance.
 
         Args:
             piece_type (str): Type of the player's game piece
             name (str, optional): Name of the player (default is "bob")
-            time_limit (float, optional): the time limit in (s)
+            weights (HeuristicWeights, optional): Heuristic weights (default is the weights.json config file)
+            evaluation (str, optional): "table" to evaluate states with precomputed city tables, "full" to
+                evaluate every city with the heuristic functions (default is "table")
+            node_budget (int, optional): If given, the number of nodes searched per move instead of a depth chosen
+                with the remaining time, for reproducible searches (default is None)
+            tt_snapshot_dir (str, optional): If given, the search keeps a transposition table, writes its deeper
+                nodes to a snapshot in this directory at the end of the game and probes the snapshot of the
+                previous games (default is the DIVERCITE_TT_DIR environment variable, no table if unset)
+            shared_tt (str, optional): If given, the name of a SharedTranspositionTable used as transposition table,
+                shared with the other processes attached to it (default is the DIVERCITE_SHARED_TT environment variable)
+            probcut (ProbCut, optional): If given, every move is searched instead of the best third, and the moves
+                whose shallow search predicts a value outside the window are not searched deeply (default is the
+                config file at the DIVERCITE_PROBCUT environment variable, no ProbCut if unset)
         """
         super().__init__(piece_type, name)
+        self.weights = weights if weights is not None else HeuristicWeights.load()
+        self.evaluation = evaluation
+        self.node_budget = node_budget
+        self._city_tables = CityTables.get(self)
+        self._nodes = 0
+        self.tt_snapshot_dir = tt_snapshot_dir if tt_snapshot_dir is not None else os.environ.get("DIVERCITE_TT_DIR")
+        self.shared_tt = shared_tt if shared_tt is not None else os.environ.get("DIVERCITE_SHARED_TT")
+        if probcut is None and os.environ.get("DIVERCITE_PROBCUT"):
+            probcut = ProbCut.load(os.environ["DIVERCITE_PROBCUT"])
+        self.probcut = probcut
+        self._tt = None
+        self._tt_key = None
+        self._tt_snapshot = None
+        self._shared_tt = None
+        self._root = None
+
+    def get_nodes(self) -> int:
+        """
+        Return the number of nodes searched by the last call to compute_action.
+
+        Returns:
+            int: The number of nodes.
+        """
+        return self._nodes
+
+    def evaluation_checksum(self) -> bytes:
+        """
+        Return a checksum of everything the values of the search depend on: the sources of the player and of
+        the game, the board config, the weights, the evaluation and the ProbCut parameters. Snapshots written with another checksum are ignored.
+
+        Returns:
+            bytes: The checksum (20 bytes).
+        """
+        sources = [inspect.getfile(CityTables), inspect.getfile(GameStateDivercite), inspect.getfile(BoardDivercite)]
+        for base in type(self).__mro__:
+            try:
+                sources.append(inspect.getfile(base))
+            except TypeError:
+                pass
+        description = f"{source_version(sources)} {self.weights.to_vector()} {self.evaluation} {BOARD_CONFIG}"
+        if self.probcut is not None:
+            description += f" {self.probcut}"
+        return hashlib.sha1(description.encode()).digest()
+
+    def tt_snapshot_path(self) -> str:
+        return os.path.join(self.tt_snapshot_dir, self.evaluation_checksum().hex()[:16] + ".tt")
+
+    def probe_tt(self, state: GameStateDivercite, depth: int, alpha: float, beta: float):
+        """
+        Return the result of a node from the transposition table, or else from the snapshot, if the node was
+        searched at least as deep and its value is usable in the window.
+
+        Returns:
+            The best move and the (value, heuristic) of the node, None if there is no usable entry.
+        """
+        key = (state.get_zobrist() ^ self._tt_key, tuple(state.scores[player.get_id()] for player in state.players))
+        entry = self._tt.get(key)
+        if entry is None and self._tt_snapshot is not None:
+            entry = self._tt_snapshot.probe(*key)
+        if entry is None or entry[0] < depth:
+            return None
+        _, flag, value, he, best_move = entry
+        if flag == TT_EXACT or (flag == TT_LOWER and value >= beta) or (flag == TT_UPPER and value <= alpha):
+            return best_move, (value, he)
+        return None
+
+    def store_tt(self, state: GameStateDivercite, depth: int, alpha: float, beta: float, best_move: int, value: float, he: float) -> None:
+        flag = TT_UPPER if value <= alpha else TT_LOWER if value >= beta else TT_EXACT
+        key = (state.get_zobrist() ^ self._tt_key, tuple(state.scores[player.get_id()] for player in state.players))
+        self._tt[key] = (depth, flag, value, he, best_move)
+
+    def save_tt_snapshot(self) -> None:
+        """
+        Write the deeper nodes of the transposition table of the game to the snapshot, merged with the nodes of
+        the previous snapshot (the deeper entry is kept).
+        """
+        entries = dict(self._tt_snapshot.entries()) if self._tt_snapshot is not None else {}
+        for key, entry in self._tt.items():
+            if entry[0] >= TT_SNAPSHOT_MIN_DEPTH:
+                previous = entries.get(key)
+                if previous is None or previous[0] <= entry[0]:
+                    entries[key] = entry
+        if len(entries) > TT_SNAPSHOT_MAX_ENTRIES:
+            entries = dict(sorted(entries.items(), key=lambda item: item[1][0], reverse=True)[:TT_SNAPSHOT_MAX_ENTRIES])
+        if self._tt_snapshot is not None:
+            self._tt_snapshot.close()
+            self._tt_snapshot = None
+        os.makedirs(self.tt_snapshot_dir, exist_ok=True)
+        TTSnapshot.write(self.tt_snapshot_path(), self.evaluation_checksum(), entries)
 
     def compute_action(self, current_state: GameStateDivercite, remaining_time: int = 1e9, **kwargs) -> Action:
         """
@@ -43,23 +183,121 @@ class MyPlayer(PlayerDivercite):
         """
 
         self.opponent_id = [key for key in current_state.scores if key != self.get_id()][0]
-        if all((value == 2 if key.endswith('C') else value == 3) for key, value in current_state.players_pieces_left[self.get_id()].items()):
-            possible_actions = [
-                d for d in current_state.generate_possible_heavy_actions()
-                if any('C' in key and value < 2 for key, value in d.next_game_state.players_pieces_left[self.get_id()].items())
-            ]
-
-            first_action_play_city = random.choice(possible_actions)
-
-            return first_action_play_city
+        self._nodes = 0
+        if all((value == BOARD_CONFIG.n_city_pieces if key.endswith('C') else value == BOARD_CONFIG.n_resource_pieces)
+               for key, value in current_state.players_pieces_left[self.get_id()].items()):
+            possible_moves = [move for move in current_state.get_possible_moves() if PIECE_IS_CITY[move // N_CELLS]]
+
+            first_move_play_city = random.choice(possible_moves)
+
+            if self.tt_snapshot_dir is not None or self.shared_tt is not None:
+                # New game: empty table (or the shared one) and the snapshot of the previous games. The keys are
+                # the Zobrist keys xored with a key of the side and of the evaluation, the tables can be shared
+                # by the two sides and by players of other weights.
+                checksum = self.evaluation_checksum()
+                self._tt_key = snapshot_key(int.from_bytes(checksum[:8], "little"), self.piece_type)
+                if self.shared_tt is not None and self._shared_tt is None:
+                    self._shared_tt = SharedTranspositionTable.attach(self.shared_tt)
+                self._tt = self._shared_tt if self._shared_tt is not None else {}
+                if self.tt_snapshot_dir is not None:
+                    if self._tt_snapshot is not None:
+                        self._tt_snapshot.close()
+                    self._tt_snapshot = TTSnapshot.open(self.tt_snapshot_path(), checksum)
+
+            return current_state.move_to_heavy_action(first_move_play_city)
         
-        depth = self.depth_depend_on_actions(len(self.filter_actions(current_state)), remaining_time)
-        action = self.alpha_beta_search(current_state, depth)
+        start = time.time()
+        if self.evaluation == "table":
+            # the states searched from the current one update the sum of the city terms instead of rescanning the board
+            self._city_tables.accumulate(current_state)
+        move = None
+        if current_state.max_step - current_state.step <= ENDGAME_STEPS:
+            # the nodes of the solver count in the node budget, the search goes on with what is left
+            node_limit = ENDGAME_NODE_LIMIT
+            if self.node_budget is not None:
+                node_limit = min(node_limit, int(self.node_budget * ENDGAME_BUDGET_SHARE))
+            if remaining_time < LOW_TIME:
+                node_limit = min(node_limit, int(remaining_time * ENDGAME_LOW_TIME_NODES))
+            move = self.solve_endgame(current_state, node_limit)
+            if move is not None:
+                logger.debug(f"{self.name}: endgame solved, {self._nodes} nodes")
+        if move is not None:
+            action = current_state.move_to_heavy_action(move)
+        elif self.node_budget is None:
+            depth = self.depth_depend_on_actions(len(self.filter_actions(current_state)), remaining_time)
+            action = self.alpha_beta_search(current_state, depth)
+        else:
+            action = self.budget_search(current_state)
+        elapsed = time.time() - start
+        logger.debug(f"{self.name}: {self._nodes} nodes, {round(self._nodes / elapsed) if elapsed > 0 else 0} nodes/s")
+        if self.tt_snapshot_dir is not None and self._tt is not None and current_state.step >= current_state.max_step - 2:
+            # Last move of the player
+            self.save_tt_snapshot()
         return action
 
 
+    def solve_endgame(self, state: GameStateDivercite, node_limit: int = ENDGAME_NODE_LIMIT) -> int:
+        """
+        Search the rest of the game for a move that wins against any reply, cutting the positions whose
+        final score bounds already decide the winner.
+
+        Args:
+            state (GameStateDivercite): The current state.
+            node_limit (int, optional): The number of nodes the solver may search, added to the node count.
+
+        Returns:
+            int: A winning move, None if there is none or if the node limit is reached first.
+        """
+        nodes = self._nodes
+        try:
+            for move in self.endgame_moves(state):
+                if self.endgame_wins(state.apply_move(move), nodes + node_limit):
+                    return move
+        except SearchBudgetExhausted:
+            pass
+        return None
+
+    def endgame_wins(self, state: GameStateDivercite, node_limit: int) -> bool:
+        # Whether we win the game with the best play of both players. Final scores are never equal (see
+        # remove_draw), so bounds that can only meet decide the winner too.
+        self._nodes += 1
+        if self._nodes > node_limit:
+            raise SearchBudgetExhausted()
+        if state.is_done():
+            return state.scores[self.get_id()] > state.scores[self.opponent_id]
+        if state.max_step - state.step >= ENDGAME_BOUNDS_STEPS:
+            bounds = state.final_score_bounds()
+            (low, high), (opponent_low, opponent_high) = bounds[self.get_id()], bounds[self.opponent_id]
+            if low >= opponent_high:
+                return True
+            if high <= opponent_low:
+                return False
+        if state.next_player.get_id() == self.get_id():
+            return any(self.endgame_wins(state.apply_move(move), node_limit) for move in self.endgame_moves(state))
+        return all(self.endgame_wins(state.apply_move(move), node_limit) for move in self.endgame_moves(state))
+
+    def endgame_moves(self, state: GameStateDivercite) -> list[int]:
+        # Every move, the ones scoring the most points first
+        scores = state.score_moves()
+        net = [points - opponent_points for points, opponent_points in zip(scores.points, scores.opponent_points)]
+        return [scores.moves[k] for k in sorted(range(len(net)), key=lambda k: -net[k])]
+
+    # iterative deepening until the node budget is spent, the deepest completed search gives the action. The nodes
+    # already counted for the move (by the endgame solver) are part of the budget.
+    def budget_search(self, current_state: GameStateDivercite) -> Action:
+        best_action = None
+        for depth in range(1, self.depth_depend_on_actions(len(self.filter_actions(current_state))) + 1):
+            try:
+                best_action = self.alpha_beta_search(current_state, depth)
+            except SearchBudgetExhausted:
+                break
+        if best_action is None:
+            best_action = current_state.move_to_heavy_action(self.filter_actions(current_state)[0][0])
+        return best_action
+
+
     def depth_depend_on_actions(self, length: list, remaining_time: int = 1e9) -> int:
-        if remaining_time < 100: 
+        if remaining_time < LOW_TIME: 
             return 3
         if length < 10:
             return 9
@@ -78,89 +316,168 @@ class MyPlayer(PlayerDivercite):
         
         alpha = -math.inf
         beta = math.inf
-        best_action, (tt, hp) = self.max_value(current_state, alpha, beta, depth) 
+        self._root = current_state
+        best_move, (tt, hp) = self.max_value(current_state, alpha, beta, depth) 
 
-        print("TT: ", tt, "HP: ", hp)
-        return best_action
+        logger.debug(f"{self.name}: TT {tt}, HP {hp}")
+        return current_state.move_to_heavy_action(best_move)
 
 
-    def max_value(self, state: GameStateDivercite, alpha: float, beta: float, depth: int, act_heur=0) -> tuple[Action, float]:
+    # the search works on encoded moves (see encode_move), only the chosen move is converted to an action
+    def max_value(self, state: GameStateDivercite, alpha: float, beta: float, depth: int, act_heur=0) -> tuple[int, float]:
+        self._nodes += 1
+        if self.node_budget is not None and self._nodes > self.node_budget:
+            raise SearchBudgetExhausted()
         if depth == 0 or state.is_done():
             h = self.state_heuristic(state, act_heur)
             return None, (h, act_heur)
+        if self._tt is not None and depth >= TT_MIN_DEPTH:
+            result = self.probe_tt(state, depth, alpha, beta)
+            if result is not None:
+                return result
 
-        best_action = None
+        tt_depth, tt_alpha, tt_beta = depth, alpha, beta
+        best_move = None
         value = -math.inf
         
-        actions = self.filter_actions(state)
+        actions = self.filter_actions(state, depth)
 
-        depth = min(depth, self.depth_depend_on_actions(len(actions)))
+        depth = min(depth, self.depth_depend_on_actions(self.search_width(actions, depth)))
 
-        for action, act_heur in actions:
-            heavy_action = action.get_heavy_action(state)
-            next_state = heavy_action.get_next_game_state()
+        for move, act_heur in actions:
+            next_state = state.apply_move(move)
+            if best_move is not None and self.probcut_skips(next_state, alpha, beta, depth - 1, act_heur, True):
+                continue
             _, (next_value, next_he) = self.min_value(next_state, alpha, beta, depth - 1, act_heur)
             
             if next_value > value:
                 value = next_value
                 he = next_he
-                best_action = heavy_action
+                best_move = move
 
             alpha = max(alpha, value)
 
             if beta <= alpha:
                 break
 
-        return best_action, (value, he)
+        if self._tt is not None and tt_depth >= TT_MIN_DEPTH:
+            self.store_tt(state, tt_depth, tt_alpha, tt_beta, best_move, value, he)
+        return best_move, (value, he)
 
 
 
-    def min_value(self, state: GameStateDivercite, alpha: float, beta: float, depth: int, act_heur=0) -> tuple[Action, float]:
+    def min_value(self, state: GameStateDivercite, alpha: float, beta: float, depth: int, act_heur=0) -> tuple[int, float]:
+        self._nodes += 1
+        if self.node_budget is not None and self._nodes > self.node_budget:
+            raise SearchBudgetExhausted()
         if depth == 0 or state.is_done():
             h = self.state_heuristic(state, act_heur)
             return None, (h, act_heur)
+        if self._tt is not None and depth >= TT_MIN_DEPTH:
+            result = self.probe_tt(state, depth, alpha, beta)
+            if result is not None:
+                return result
 
-        best_action = None
+        tt_depth, tt_alpha, tt_beta = depth, alpha, beta
+        best_move = None
         value = math.inf
 
-        actions = self.filter_actions(state)
+        actions = self.filter_actions(state, depth)
 
-        depth = min(depth, self.depth_depend_on_actions(len(actions)))
+        depth = min(depth, self.depth_depend_on_actions(self.search_width(actions, depth)))
 
-        for action, act_heur in actions:
-            heavy_action = action.get_heavy_action(state)
-            next_state = heavy_action.get_next_game_state()
-           
+        for move, act_heur in actions:
+            next_state = state.apply_move(move)
+            if best_move is not None and self.probcut_skips(next_state, alpha, beta, depth - 1, act_heur, False):
+                continue
             _, (next_value, next_he) = self.max_value(next_state, alpha, beta, depth - 1, act_heur)
             if next_value < value:
                 value = next_value
                 he = next_he
-                best_action = heavy_action
+                best_move = move
 
             beta = min(beta, value)
 
             if beta <= alpha:
                 break
 
-        return best_action, (value, he)
+        if self._tt is not None and tt_depth >= TT_MIN_DEPTH:
+            self.store_tt(state, tt_depth, tt_alpha, tt_beta, best_move, value, he)
+        return best_move, (value, he)
 
 
-    def filter_actions(self, state: GameStateDivercite) -> list[LightAction]:
-        actions = list(state.generate_possible_light_actions())
+    def filter_actions(self, state: GameStateDivercite, depth: int = None) -> list[tuple[int, float]]:
+        moves = state.get_possible_moves()
         actions_with_heuristics = [
-            (action, heuristic_value)
-            for action in actions
-            if (heuristic_value := self.action_heuristic(action, state)) is not None and heuristic_value >= 0
+            (move, heuristic_value)
+            for move in moves
+            if (heuristic_value := self.action_heuristic(move, state)) is not None and heuristic_value >= 0
         ]
 
         if len(actions_with_heuristics) == 0:
-            return [(action, 1) for action in actions]
+            return [(move, 1) for move in moves]
 
-        filtered_actions = sorted(actions_with_heuristics, key=lambda x: x[1], reverse=True)
+        if state is self._root:
+            # at the root, the moves of equal heuristic (most of them) are ordered by their one-reply swing, which
+            # decides the moves kept in the best third. It costs too much to compute at every node.
+            filtered_actions = sorted(actions_with_heuristics, key=lambda x: (x[1], swing_score(state, x[0])), reverse=True)
+        else:
+            filtered_actions = sorted(actions_with_heuristics, key=lambda x: x[1], reverse=True)
+        # with ProbCut every move is kept where the children can be skipped by it
+        if self.probcut_prunes(depth):
+            return filtered_actions
         return filtered_actions[:len(filtered_actions)//3] if len(filtered_actions) > 30 else filtered_actions
+
+    def probcut_prunes(self, depth: int) -> bool:
+        # Whether ProbCut can skip the children of a node of this depth
+        return self.probcut is not None and depth is not None and depth - 1 >= self.probcut.deep_depth
+
+    def search_width(self, actions: list, depth: int = None) -> int:
+        # The depth is chosen for the number of moves searched deeply, with ProbCut about as many as the best third
+        if self.probcut_prunes(depth) and len(actions) > 30:
+            return len(actions) // 3
+        return len(actions)
+
+    def probcut_skips(self, state: GameStateDivercite, alpha: float, beta: float, depth: int, act_heur: float,
+                      maximizing: bool) -> bool:
+        """
+        Search a child state at the shallow depth of ProbCut and tell whether its search at `depth` can be
+        skipped: its predicted value is under alpha (child of a max node) or over beta (child of a min node)
+        with enough confidence.
+
+        Args:
+            state (GameStateDivercite): The child state.
+            alpha (float): The lower bound of the window of the parent.
+            beta (float): The upper bound of the window of the parent.
+            depth (int): The depth the child would be searched at.
+            act_heur (float): The action heuristic of the move to the child.
+            maximizing (bool): Whether the parent is a max node.
+
+        Returns:
+            bool: Whether the child can be skipped.
+        """
+        probcut = self.probcut
+        if probcut is None or depth < probcut.deep_depth or probcut.slope <= 0 or probcut.threshold == math.inf:
+            return False
+        shallow_depth = probcut.shallow_depth_for(depth)
+        if maximizing:
+            if alpha == -math.inf:
+                return False
+            bound = probcut.low_bound(alpha)
+            # null window search around the bound, the fail soft value tells on which side the value is
+            _, (value, _) = self.min_value(state, bound, math.nextafter(bound, math.inf), shallow_depth, act_heur)
+            return value <= bound
+        if beta == math.inf:
+            return False
+        bound = probcut.high_bound(beta)
+        _, (value, _) = self.max_value(state, math.nextafter(bound, -math.inf), bound, shallow_depth, act_heur)
+        return value >= bound
    
    
     def state_heuristic(self, state: GameState, ligth_action_heur: int = 0) -> int:
+        if self.evaluation == "table":
+            return self._city_tables.state_heuristic(state, self.get_id(), self.opponent_id, self.weights.opponent_factor)
+
         player_id = self.get_id()
         score = state.scores[player_id]
         opponent_score = state.scores[self.opponent_id]
@@ -169,80 +486,49 @@ class MyPlayer(PlayerDivercite):
 
         for pos, piece in pieces_on_borad:
             if isinstance(piece, Piece):
-                if piece.get_type()[1] == 'C':
+                if piece.is_city:
                     if piece.owner_id == player_id:
-                        score += self.evaluate_my_city((piece, pos), state.rep)
+                        score += self.evaluate_my_city((piece, pos), state.rep) * self.weights.my_city_factor
                     else:
                         score += self.evaluate_opponent_city((piece, pos), state.rep)
-                        opponent_score += self.evaluate_my_city((piece, pos), state.rep)/2
+                        opponent_score += self.evaluate_my_city((piece, pos), state.rep) * self.weights.opponent_city_factor
 
-        return score - opponent_score * 0.8
+        return score - opponent_score * self.weights.opponent_factor
 
 
 
     # try to uniformize the usage of pice by color
-    def action_heuristic(self, action: LightAction, state: GameStateDivercite) -> int:
+    def action_heuristic(self, move: int, state: GameStateDivercite) -> int:
         player_id = self.get_id()
+        piece, (x, y) = decode_move(move)
         
-        if action.data['piece'].endswith('R'):
+        if piece.endswith('R'):
             value = 0
-            x, y = action.data['position']
             neighbours = state.get_neighbours(x, y)
             
             for key_pos, neighbor_piece in neighbours.items():
                 if not isinstance(neighbor_piece[0], Piece):  
                     continue
-                if neighbor_piece[0].piece_type[1] == 'C':  
+                if neighbor_piece[0].is_city:  
                     if neighbor_piece[0].owner_id == player_id:
-                        value += self.evaluate_my_city(neighbor_piece, state.rep, action.data['piece'][0])
+                        value += self.evaluate_my_city(neighbor_piece, state.rep, piece[0])
                     else:
-                        value += self.evaluate_opponent_city(neighbor_piece, state.rep, action.data['piece'][0])
+                        value += self.evaluate_opponent_city(neighbor_piece, state.rep, piece[0])
             
             # don't want to expend action of resource if no city around or don't cancel opponent divercite
             if value <= 0:
                 return 0
         else:
-            value = 1
-            x, y = action.data['position']
+            value = self.weights.city_base
             neighbours: dict[str|Piece, tuple] = state.get_neighbours(x, y)
 
-            value += self.city_heuristic(neighbours, action.data['piece'][0])
+            value += self.city_heuristic(neighbours, piece[0])
         
-        remaining_pieces = state.players_pieces_left[player_id]
-        remaining_pieces[action.data['piece']] -= 1
-
-        color_counts_R = {
-            'R': remaining_pieces['RR'] ,#+ remaining_pieces['RC'],
-            'G': remaining_pieces['GR'] ,#+ remaining_pieces['GC'],
-            'B': remaining_pieces['BR'] ,#+ remaining_pieces['BC'],
-            'Y': remaining_pieces['YR'] ,#+ remaining_pieces['YC']
-        }
-
-        color_counts_C = {
-            'R': remaining_pieces['RC'],
-            'G': remaining_pieces['GC'],
-            'B': remaining_pieces['BC'],
-            'Y': remaining_pieces['YC']
-        }
-
-        # color_counts = {
-        #     'R': 3 + 2,
-        #     'G': 2 + 2,
-        #     'B': 0 + 1,
-        #     'Y': 3 + 0
-        # }
-        avg_pieces = sum(color_counts_R.values()) / len(color_counts_R)
-        imbalance_penalty = sum(abs(count - avg_pieces) for count in color_counts_R.values())
+        # color balance of the resources and of the cities left after the action
+        remaining_pieces = state.players_pieces_left[player_id].decrement(piece)
 
-
-        value += 2 / (imbalance_penalty/2 + 1)
-
-        avg_pieces = sum(color_counts_C.values()) / len(color_counts_C)
-        imbalance_penalty = sum(abs(count - avg_pieces) for count in color_counts_C.values())
-
-        value += 2 / (imbalance_penalty/2 + 1)
-
-        remaining_pieces[action.data['piece']] += 1 # restore the state
+        value += self.weights.balance_weight / (remaining_pieces.resource_imbalance * self.weights.balance_scale + 1)
+        value += self.weights.balance_weight / (remaining_pieces.city_imbalance * self.weights.balance_scale + 1)
 
         return value
 
@@ -252,24 +538,24 @@ class MyPlayer(PlayerDivercite):
         city_pos = city[1]
         neighbors = board.get_neighbours(city_pos[0], city_pos[1])
 
-        neighbor_piece_colors = [n[0].get_type()[0] for n in neighbors.values() if isinstance(n[0], Piece)]
+        neighbor_piece_colors = [n[0].color for n in neighbors.values() if isinstance(n[0], Piece)]
 
         if len(set(neighbor_piece_colors).union(set([piece_color]))) == 4:
-            return 6
+            return self.weights.divercite_threat
         
         if not piece_color is None:
             neighbor_piece_colors.append(piece_color) 
         if len(set(neighbor_piece_colors)) == len(neighbor_piece_colors):
             return len(neighbor_piece_colors) + 1
         else:
-            return len([p for p in neighbor_piece_colors if p == city[0].get_type()[0]])
+            return len([p for p in neighbor_piece_colors if p == city[0].color])
         
 
     def evaluate_opponent_city(self, city: tuple[Piece, tuple[int, int]], board: BoardDivercite, piece_color=None) -> int:
         city_pos = city[1]
         neighbors = board.get_neighbours(city_pos[0], city_pos[1])
 
-        neighbor_piece_colors = [n[0].get_type()[0] for n in neighbors.values() if isinstance(n[0], Piece)]
+        neighbor_piece_colors = [n[0].color for n in neighbors.values() if isinstance(n[0], Piece)]
         if len(neighbor_piece_colors) < 3 or len(neighbor_piece_colors) != len(set(neighbor_piece_colors)):
             return 0
         
@@ -277,12 +563,12 @@ class MyPlayer(PlayerDivercite):
             neighbor_piece_colors.append(piece_color)
             
         if len(neighbor_piece_colors) == 4 and len(set(neighbor_piece_colors)) != 4:
-            return 6
+            return self.weights.divercite_threat
         return 0
 
 
     def city_heuristic(self, neighbours: dict[str|Piece, tuple], city_color) -> int:
-        neighbor_piece_colors = [n[0].get_type()[0] for n in neighbours.values() if isinstance(n[0], Piece)]
+        neighbor_piece_colors = [n[0].color for n in neighbours.values() if isinstance(n[0], Piece)]
 
         if len(set(neighbor_piece_colors)) == len(neighbor_piece_colors):
             return len(set(neighbor_piece_colors)) + 1
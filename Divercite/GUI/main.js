@@ -113,6 +113,9 @@ $(document).ready(function() {
     var piecesLeftCoordinates = {};
     var steps = [];
     var index = -1;
+    var replay = null;
+    // number of reconstructed steps of a replay kept in memory
+    const replayWindow = 200;
     var play = false;
     var lastCellMouseOn = null;
     var lastPieceMouseOn = null;
@@ -177,14 +180,14 @@ $(document).ready(function() {
                 selectedPiece = piece;
                 // make a highlight on the selected piece
                 ctxPlayers[player].clearRect(0, 0, canvasPlayers[player].width, canvasPlayers[player].height);
-                drawPlayersRepresentation(steps[index] ? steps[index].players : firstPlayersData);
+                drawPlayersRepresentation(stepAt(index) ? stepAt(index).players : firstPlayersData);
                 drawPiece(piecesLeftCoordinates[piece], ctxPlayers[player], pieceBgImg, false);
                 highlightPiece(piece, ctxPlayers[player]);
             }
             else {
                 selectedPiece = null;
                 ctxPlayers[player].clearRect(0, 0, canvasPlayers[player].width, canvasPlayers[player].height);
-                drawPlayersRepresentation(steps[index] ? steps[index].players : firstPlayersData);
+                drawPlayersRepresentation(stepAt(index) ? stepAt(index).players : firstPlayersData);
                 drawPiece(piecesLeftCoordinates[piece], ctxPlayers[player], pieceBgImg, false);
             }
         }
@@ -198,7 +201,7 @@ $(document).ready(function() {
         if (piece !== null && (lastPieceMouseOn === null || piece+player !== lastPieceMouseOn)) {
             canvasPlayers[player].style.cursor = "pointer";
             ctxPlayers[player].clearRect(0, 0, canvasPlayers[player].width, canvasPlayers[player].height);
-            drawPlayersRepresentation(steps[index] ? steps[index].players : firstPlayersData);
+            drawPlayersRepresentation(stepAt(index) ? stepAt(index).players : firstPlayersData);
             drawPiece(piecesLeftCoordinates[piece], ctxPlayers[player], pieceBgImg, false);
             highlightPiece(selectedPiece, ctxPlayers[player]);
             lastPieceMouseOn = piece+player;
@@ -236,7 +239,7 @@ $(document).ready(function() {
         if (cell !== null && (lastCellMouseOn === null || cell.toString() !== lastCellMouseOn.toString())) {
             canvasBoard.style.cursor = "pointer";
             ctxBoard.clearRect(0, 0, canvasBoard.width, canvasBoard.height);
-            drawGrid(steps[index] ? steps[index].env : {});
+            drawGrid(stepAt(index) ? stepAt(index).env : {});
             placePiece(cell[0], cell[1], pieceBgImg);
             lastCellMouseOn = cell;
         }else if(cell === null){
@@ -262,6 +265,12 @@ $(document).ready(function() {
     
     $("#loadJson").on("change", function() {
         const file = this.files[0];
+        if (file.name.endsWith(".jsonl")) {
+            loadReplay(file);
+            return;
+        }
+        replay = null;
+        $("#game").css("display", "none");
         const reader = new FileReader();
         reader.onload = function(e) {
             const json = JSON.parse(e.target.result);
@@ -277,6 +286,89 @@ $(document).ready(function() {
         reader.readAsText(file);
     });
 
+    $("#game").on("change", function() {
+        replay.game = Number(this.value);
+        index = 0;
+        drawNewState(stepAt(index));
+    });
+
+    /* Replays written by replay_log.py: the moves are kept, the steps are rebuilt from the closest checkpoint */
+    function stepAt(i) {
+        return replay ? replayStep(replay.games[replay.game], i) : steps[i];
+    }
+
+    function stepCount() {
+        return replay ? replay.games[replay.game].moves.length + 1 : steps.length;
+    }
+
+    async function loadReplay(file) {
+        replay = {"games": [], "game": 0, "window": new Map()};
+        $("#game").empty().css("display", "inline");
+        // the file is read line by line, the first game is shown as soon as it starts
+        const reader = file.stream().pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = "";
+        while (true) {
+            const {value, done} = await reader.read();
+            if (done) break;
+            const lines = (buffer + value).split("\n");
+            buffer = lines.pop();
+            for (const line of lines) readReplayLine(line);
+        }
+        readReplayLine(buffer);
+    }
+
+    function readReplayLine(line) {
+        if (!line.trim()) return;
+        const record = JSON.parse(line);
+        if (record.game !== undefined) {
+            replay.games.push({"id": record.game, "players": record.players, "interval": record.checkpoint_interval,
+                               "moves": [], "checkpoints": [record]});
+            $("#game").append(new Option("Game " + (record.game + 1), replay.games.length - 1));
+            if (replay.games.length === 1) {
+                index = 0;
+                drawNewState(stepAt(index));
+            }
+            return;
+        }
+        const game = replay.games[replay.games.length - 1];
+        if (record.checkpoint !== undefined) {
+            game.checkpoints[record.checkpoint / game.interval] = record;
+        } else {
+            game.moves.push(record);
+        }
+    }
+
+    function replayStep(game, i) {
+        const key = game.id + ":" + i;
+        let step = replay.window.get(key);
+        if (step) {
+            // most recently used steps are kept at the end of the window
+            replay.window.delete(key);
+            replay.window.set(key, step);
+            return step;
+        }
+        let c = Math.floor(i / game.interval);
+        while (!game.checkpoints[c]) c--;
+        const checkpoint = game.checkpoints[c];
+        const env = Object.assign({}, checkpoint.env);
+        const piecesLeft = JSON.parse(JSON.stringify(checkpoint.pieces_left));
+        let scores = checkpoint.scores;
+        let nextPlayer = checkpoint.next_player;
+        for (let k = c * game.interval; k < i; k++) {
+            const move = game.moves[k];
+            env["(" + move.position[0] + ", " + move.position[1] + ")"] = {"piece_type": move.move, "owner_id": move.owner_id};
+            piecesLeft[move.owner_id][move.move.substring(0, 2)]--;
+            scores = move.scores;
+            nextPlayer = move.next_player;
+        }
+        step = {"env": env, "players": convertToPlayerInfo(game.players, scores, piecesLeft), "next_player": nextPlayer};
+        replay.window.set(key, step);
+        if (replay.window.size > replayWindow) {
+            replay.window.delete(replay.window.keys().next().value);
+        }
+        return step;
+    }
+
 
     $('#time').on('change', function() {
         play = false;
@@ -292,9 +384,9 @@ $(document).ready(function() {
         
         loop = setInterval(function() {
             if (play) {
-                if (index < steps.length - 1) {
+                if (index < stepCount() - 1) {
                     index++;
-                    drawNewState(steps[index]);
+                    drawNewState(stepAt(index));
                 } else {
                     play = false;
                     clearInterval(loop);
@@ -311,19 +403,19 @@ $(document).ready(function() {
 
     $("#reset").click(function() {
         index = 0;
-        drawNewState(steps[index]);
+        drawNewState(stepAt(index));
     });
     $("#next").click(function() {
-        if (index < steps.length - 1) {
+        if (index < stepCount() - 1) {
             index++;
-            drawNewState(steps[index]);
+            drawNewState(stepAt(index));
         }
     });
 
     $("#previous").click(function() {
         if (index > 0) {
             index--;
-            drawNewState(steps[index]);
+            drawNewState(stepAt(index));
         }
     });
     $("#close_pop_up").click(function() {
@@ -357,6 +449,8 @@ $(document).ready(function() {
             json = JSON.parse(args[0]);
             if (!json.rep) json = JSON.parse(json);
             if (json.rep && json.rep.env) {
+                replay = null;
+                $("#game").css("display", "none");
                 nextPlayer = json.next_player.name;
                 const players_info = convertToPlayerInfo(json.players, json.scores, json.players_pieces_left);
                 steps.push({"env": json.rep.env, "players":players_info, "next_player": nextPlayer});
@@ -372,7 +466,7 @@ $(document).ready(function() {
                 $("#error").css("opacity", "0");
             }, 2000);
             selectedPiece = null;
-            drawPlayersRepresentation(steps[index] ? steps[index].players : firstPlayersData);
+            drawPlayersRepresentation(stepAt(index) ? stepAt(index).players : firstPlayersData);
         })
 
         socket.on("disconnect", (...args) => {
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+from seahorse.game.action import Action
+from seahorse.game.heavy_action import HeavyAction
+from seahorse.player.player import Player
+from seahorse.player.proxies import LocalPlayerProxy
+
+from delta_proxies import DeltaLocalPlayerProxy, played_move
+from game_state_divercite import GameStateDivercite
+
+# Seconds between two search statistics sent by the search process
+STATS_INTERVAL = 1.0
+
+# Search process protocol, over a pipe:
+#   proxy -> process: (state json, ID of the player, remaining time) to search a state
+#   process -> proxy: ("stats", {...}) during the search, then ("move", encoded move) or ("error", message)
+
+
+def search_stats(player: Player, start: float) -> dict:
+    """
+    Return the statistics of the search in progress of a player.
+
+    Args:
+        player (Player): The player searching.
+        start (float): The time the search started.
+
+    Returns:
+        dict: The elapsed time, and the number of nodes searched if the player counts them.
+    """
+    stats = {"elapsed": time.time() - start}
+    if hasattr(player, "get_nodes"):
+        stats["nodes"] = player.get_nodes()
+    return stats
+
+
+def search_loop(player: Player, conn, stats_interval: float) -> None:
+    """
+    Main loop of a search process: search the states received and send back the statistics and the moves.
+
+    Args:
+        player (Player): The player searching, kept between turns (with its tables and caches).
+        conn: The end of the pipe of the process.
+        stats_interval (float): Seconds between two statistics.
+    """
+    while True:
+        try:
+            state_json, player_id, remaining_time = conn.recv()
+        except EOFError:
+            return
+        player.id = player_id
+        state = GameStateDivercite.from_json(state_json, next_player=player)
+        state.players = [player if p.get_id() == player_id else p for p in state.players]
+        start = time.time()
+        done = threading.Event()
+
+        def report():
+            while not done.wait(stats_interval):
+                conn.send(("stats", search_stats(player, start)))
+
+        reporter = threading.Thread(target=report, daemon=True)
+        reporter.start()
+        try:
+            action = player.compute_action(current_state=state, remaining_time=remaining_time)
+            reply = ("move", played_move(state, action.get_heavy_action(state).get_next_game_state()))
+        except Exception as e:
+            reply = ("error", repr(e))
+        done.set()
+        reporter.join()
+        conn.send(("stats", search_stats(player, start)))
+        conn.send(reply)
+
+
+class SearchCancelledError(Exception):
+    """
+    Raised when a search is cancelled or its process stops.
+    """
+
+
+class SearchWorker:
+    """
+    A player searching in a dedicated process, driven from an event loop: the loop is never blocked by the search,
+    the move is returned through a future and the statistics of the search are given to a callback while it runs.
+    Cancelling a search stops the process, a new one is started for the next search.
+
+    Attributes:
+        player (Player): The player copied to the search process.
+        stats_interval (float): Seconds between two statistics.
+    """
+
+    def __init__(self, player: Player, stats_interval: float = STATS_INTERVAL) -> None:
+        self.player = player
+        self.stats_interval = stats_interval
+        self._process = None
+        self._conn = None
+        self._future = None
+
+    def start(self) -> None:
+        """
+        Start the search process, with a copy of the player.
+        """
+        # the process is spawned: a fork would copy the sockets and the threads of the event loop
+        context = multiprocessing.get_context("spawn")
+        conn, child_conn = context.Pipe()
+        self._process = context.Process(target=search_loop, args=(self.player, child_conn, self.stats_interval), daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._conn = conn
+
+    def submit(self, current_state: GameStateDivercite, remaining_time: float,
+               on_stats: Optional[Callable[[dict], None]] = None) -> asyncio.Future:
+        """
+        Start the search of a state in the search process.
+
+        Args:
+            current_state (GameStateDivercite): The state, with the player as next player.
+            remaining_time (float): The remaining time of the player.
+            on_stats (Optional[Callable[[dict], None]], optional): Called with each statistics of the search.
+
+        Returns:
+            asyncio.Future: The encoded move found, cancelling it stops the search. It raises
+                SearchCancelledError if the search is cancelled by `cancel` or the process stops.
+        """
+        if self._process is None or not self._process.is_alive():
+            self.start()
+        loop = asyncio.get_running_loop()
+        future = self._future = loop.create_future()
+        future.add_done_callback(self._search_done)
+        self._conn.send((json.dumps(current_state.to_json(), default=lambda x: x.to_json()),
+                         self.player.get_id(), remaining_time))
+        loop.create_task(self._read(self._conn, future, on_stats))
+        return future
+
+    def _search_done(self, future: asyncio.Future) -> None:
+        # A future cancelled by the caller stops the search
+        if future.cancelled():
+            self.close()
+
+    async def _read(self, conn, future: asyncio.Future, on_stats: Optional[Callable[[dict], None]]) -> None:
+        # Receives the messages of the search in a thread, so the event loop keeps running
+        loop = asyncio.get_running_loop()
+        while not future.done():
+            try:
+                kind, data = await loop.run_in_executor(None, conn.recv)
+            except (EOFError, OSError):
+                if not future.done():
+                    future.set_exception(SearchCancelledError("The search process stopped"))
+                return
+            if future.done():
+                return
+            if kind == "stats":
+                if on_stats is not None:
+                    on_stats(data)
+            elif kind == "move":
+                future.set_result(data)
+            else:
+                future.set_exception(RuntimeError(f"The search failed: {data}"))
+
+    def cancel(self) -> None:
+        """
+        Cancel the search in progress, if any, by stopping the search process.
+        """
+        if self._future is not None and not self._future.done():
+            self._future.set_exception(SearchCancelledError("The search was cancelled"))
+            self._future = None
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop the search process.
+        """
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._conn.close()
+            self._process = None
+
+
+class AsyncSearchMixin:
+    """
+    Runs the search of a local player proxy in a SearchWorker, so the socket connection keeps answering during the
+    search. The search is cancelled when the game ends (the host sends "done", e.g. after a timeout) or the
+    connection is lost.
+    """
+
+    def start_search_worker(self) -> None:
+        self.search_worker = SearchWorker(self.wrapped_player)
+
+        @self.sio.on("done")
+        async def handle_done(*_):
+            self.search_worker.cancel()
+
+        @self.sio.on("disconnect")
+        def handle_disconnect():
+            self.connected = False
+            self.search_worker.cancel()
+
+    async def search_action(self, current_state: GameStateDivercite, remaining_time: float) -> Action:
+        """
+        Search the action of the player in the search process.
+
+        Args:
+            current_state (GameStateDivercite): The current game state.
+            remaining_time (float): The remaining time of the player.
+
+        Raises:
+            SearchCancelledError: If the search was cancelled or its process stopped.
+
+        Returns:
+            Action: The action.
+        """
+        def log_stats(stats: dict) -> None:
+            nodes = f", {stats['nodes']} nodes" if "nodes" in stats else ""
+            logger.info(f"{self.wrapped_player.name} searching: {stats['elapsed']:.1f} s{nodes}")
+
+        try:
+            move = await self.search_worker.submit(current_state, remaining_time, log_stats)
+        except SearchCancelledError as e:
+            logger.warning(f"{e}")
+            raise
+        return HeavyAction(current_state, current_state.apply_move(move))
+
+
+class AsyncLocalPlayerProxy(AsyncSearchMixin, LocalPlayerProxy):
+    """
+    Local player proxy searching in a dedicated process (see AsyncSearchMixin).
+
+    Attributes:
+        wrapped_player (Player): The wrapped player object.
+        search_worker (SearchWorker): The search process of the player.
+    """
+
+    def __init__(self, wrapped_player: Player, gs: type = GameStateDivercite) -> None:
+        super().__init__(wrapped_player, gs=gs)
+        self.start_search_worker()
+
+    async def play(self, current_state: GameStateDivercite, remaining_time: int) -> Action:
+        """
+        Search a move in the search process and send the action.
+
+        Args:
+            current_state (GameStateDivercite): The current game state.
+            remaining_time (int): The remaining time of the player.
+
+        Raises:
+            SearchCancelledError: If the search was cancelled (the game ended or the connection was lost), nothing
+                is sent then.
+
+        Returns:
+            Action: The action resulting from the move, never None.
+        """
+        action = await self.search_action(current_state, remaining_time)
+        await self.sio.emit("action", json.dumps(action.to_json(), default=lambda x: x.to_json()))
+        return action
+
+
+class AsyncDeltaLocalPlayerProxy(AsyncSearchMixin, DeltaLocalPlayerProxy):
+    """
+    Delta local player proxy (see delta_proxies.py) searching in a dedicated process (see AsyncSearchMixin).
+
+    Attributes:
+        wrapped_player (Player): The wrapped player object.
+        search_worker (SearchWorker): The search process of the player.
+    """
+
+    def __init__(self, wrapped_player: Player, gs: type = GameStateDivercite) -> None:
+        super().__init__(wrapped_player, gs=gs)
+        self.start_search_worker()
+
+    async def next_action(self, current_state: GameStateDivercite, remaining_time: int) -> Action:
+        return await self.search_action(current_state, remaining_time)
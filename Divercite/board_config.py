@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+# Path of a board config file (json), read once at import: every table of the engine (masks, cells, neighbours,
+# Zobrist keys, move encoding, city tables) is derived from the config, so all the processes of a game or a
+# benchmark must be started with the same one
+BOARD_CONFIG_ENV = "DIVERCITE_BOARD"
+
+
+@dataclass
+class BoardConfig:
+    """
+    The geometry and the pieces of a game, the standard game by default. The board is a diamond of cells at
+    most `radius` steps from the center, resources on the cells of the same parity as the tips and cities on
+    the others. A city has 4 neighbours, so a divercite is still 4 resources of different colors.
+
+    Attributes:
+        radius (int): The radius of the board, the grid is (2 * radius + 1) x (2 * radius + 1).
+        colors (Tuple[str, ...]): The colors of the pieces, one letter each.
+        n_resource_pieces (int): The number of resources of each color of each player.
+        n_city_pieces (int): The number of cities of each color of each player.
+        max_step (Optional[int]): The number of moves of a game, None for all the pieces of both players.
+    """
+
+    radius: int = 4
+    colors: Tuple[str, ...] = ("R", "G", "B", "Y")
+    n_resource_pieces: int = 3
+    n_city_pieces: int = 2
+    max_step: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self.colors = tuple(self.colors)
+        n_pieces = 2 * len(self.colors) * (self.n_resource_pieces + self.n_city_pieces)
+        if self.max_step is None:
+            self.max_step = n_pieces
+        mask = self.board_mask()
+        n_cities = sum(row.count('C') for row in mask)
+        n_resources = sum(row.count('R') for row in mask)
+        if len(self.colors) < 4 or any(len(color) != 1 for color in self.colors) or len(set(self.colors)) != len(self.colors):
+            raise ValueError(f"At least 4 distinct one letter colors are needed, got {self.colors}")
+        if 2 * len(self.colors) * self.n_city_pieces > n_cities or 2 * len(self.colors) * self.n_resource_pieces > n_resources:
+            raise ValueError(f"The pieces do not fit on a board of radius {self.radius} "
+                             f"({n_cities} city cells, {n_resources} resource cells)")
+        if not 0 < self.max_step <= n_pieces:
+            raise ValueError(f"The game length must be at most the {n_pieces} pieces of the players, got {self.max_step}")
+
+    @property
+    def size(self) -> int:
+        return 2 * self.radius + 1
+
+    def forbidden_mask(self) -> List[List[bool]]:
+        """
+        Return the mask of the cells outside the diamond.
+
+        Returns:
+            List[List[bool]]: True for the cells outside the board, by row and column.
+        """
+        return [[abs(i - self.radius) + abs(j - self.radius) > self.radius for j in range(self.size)] for i in range(self.size)]
+
+    def board_mask(self) -> List[list]:
+        """
+        Return the kind of each cell: 'C' for a city, 'R' for a resource, 0 outside the board.
+
+        Returns:
+            List[list]: The kind of the cells, by row and column.
+        """
+        return [[0 if forbidden else 'R' if (i + j - self.radius) % 2 == 0 else 'C' for j, forbidden in enumerate(row)]
+                for i, row in enumerate(self.forbidden_mask())]
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: str) -> BoardConfig:
+        return cls(**json.loads(data))
+
+    def save(self, path: str) -> None:
+        """
+        Write the config to a file.
+
+        Args:
+            path (str): Path of the config file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str) -> BoardConfig:
+        """
+        Read the config from a file.
+
+        Args:
+            path (str): Path of the config file.
+
+        Returns:
+            BoardConfig: The loaded config.
+        """
+        with open(path) as f:
+            return cls.from_json(f.read())
+
+    @classmethod
+    def from_env(cls) -> BoardConfig:
+        """
+        Return the config of the file given by DIVERCITE_BOARD, the standard game if it is not set.
+
+        Returns:
+            BoardConfig: The config.
+        """
+        path = os.environ.get(BOARD_CONFIG_ENV)
+        return cls.load(path) if path else cls()
+
+
+# The config of this process
+BOARD_CONFIG = BoardConfig.from_env()
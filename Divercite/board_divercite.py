@@ -2,6 +2,8 @@ from __future__ import annotations
 import json
 from typing import Dict, List, Tuple
 from colorama import Fore, Style
+from board_config import BOARD_CONFIG
+from piece_divercite import PieceDivercite
 from seahorse.game.game_layout.board import Board, Piece
 from seahorse.utils.serializer import Serializable
 
@@ -12,6 +14,9 @@ class BoardDivercite(Board):
     Attributes:
         env (dict[Tuple[int], Piece]): The environment dictionary composed of pieces.
         dimensions (list[int]): The dimensions of the board.
+
+    A board built with with_piece only keeps its parent and the piece added: its environment is built on first
+    access, from the closest ancestor whose environment is built.
     """
 
     #EMPTY_POS=3
@@ -20,63 +25,99 @@ class BoardDivercite(Board):
     RESOURCE_POS=2
 
 
-    FORBIDDEN_MASK = [
-     [True,  True,  True,  True,  False, True,  True,  True,  True],
-     [True,  True,  True,  False, False, False, True,  True,  True],
-     [True,  True,  False, False, False, False, False, True,  True],
-     [True,  False, False, False, False, False, False, False, True],
-     [False, False, False, False, False, False, False, False, False],
-     [True,  False, False, False, False, False, False, False, True],
-     [True,  True,  False, False, False, False, False, True,  True],
-     [True,  True,  True,  False, False, False, True,  True,  True],
-     [True,  True,  True,  True,  False, True,  True,  True,  True]
-    ]
-
-    BOARD_MASK = [
-            [ 0,   0,   0,   0,  'R',  0,   0,   0,   0],
-            [ 0,   0,   0,  'R', 'C', 'R',  0,   0,   0],
-            [ 0,   0,  'R', 'C', 'R', 'C', 'R',  0,   0],
-            [ 0,  'R', 'C', 'R', 'C', 'R', 'C', 'R',  0],
-            ['R', 'C', 'R', 'C', 'R', 'C', 'R', 'C', 'R'],
-            [ 0,  'R', 'C', 'R', 'C', 'R', 'C', 'R',  0],
-            [ 0,   0,  'R', 'C', 'R', 'C', 'R',  0,   0],
-            [ 0,   0,   0,  'R', 'C', 'R',  0,   0,   0],
-            [ 0,   0,   0,   0,  'R',  0,   0,   0,   0]
-]
+    # Diamond of the board config (see board_config.py), 9x9 in the standard game
+    FORBIDDEN_MASK = BOARD_CONFIG.forbidden_mask()
+
+    BOARD_MASK = BOARD_CONFIG.board_mask()
 
 
+    # Set to False by the master when its log level does not print the board
+    RENDER = True
+
+    FORE_COLORS = {'R': Fore.RED, 'G': Fore.GREEN, 'Y': Fore.YELLOW, 'B': Fore.BLUE, 'Black': Fore.BLACK}
+    # Color of the other colors of a board config
+    OTHER_FORE_COLOR = Fore.MAGENTA
+
     def __init__(self, env: dict[tuple[int], Piece], dim: list[int]) -> None:
         super().__init__(env, dim)
+        self._rendering = None
+
+    @classmethod
+    def with_piece(cls, parent: BoardDivercite, pos: Tuple[int, int], piece: Piece) -> BoardDivercite:
+        """
+        Return the board with a piece added to a parent board, sharing the environment of the parent.
+        Boards are not modified once built, so the parent can be shared.
+
+        Args:
+            parent (BoardDivercite): The parent board.
+            pos (Tuple[int, int]): The position of the piece.
+            piece (Piece): The piece added.
+
+        Returns:
+            BoardDivercite: The new board.
+        """
+        board = cls.__new__(cls)
+        board.dimensions = parent.dimensions
+        board._env = None
+        board._parent = parent
+        board._delta = (pos, piece)
+        board._rendering = None
+        return board
+
+    @property
+    def env(self) -> dict[tuple[int], Piece]:
+        if self._env is None:
+            deltas = []
+            board = self
+            while board._env is None:
+                deltas.append(board._delta)
+                board = board._parent
+            env = board._env.copy()
+            for pos, piece in reversed(deltas):
+                env[pos] = piece
+            self._env = env
+            self._parent = None
+        return self._env
+
+    @env.setter
+    def env(self, env: dict[tuple[int], Piece]) -> None:
+        self._env = env
+        self._parent = None
+        self._delta = None
+
+    def __getstate__(self) -> dict:
+        # Pickled boards (e.g. sent to worker processes) do not carry their ancestors
+        state = dict(self.__dict__)
+        state["_env"], state["_parent"], state["_delta"] = self.env, None, None
+        return state
 
     def __str__(self):
-        grid_data = self.get_grid()
-        rotated_grid = self.rotate_grid_45(grid_data)
-        board_string = "\n"
-        max_len = max(len(row) for row in rotated_grid)
-        for i, row in enumerate(rotated_grid):
-            if all(cell == ' ' for cell in row):
-                continue
-            padded_row = [' '] * ((max_len - len(row)) // 2) + row + [' '] * ((max_len - len(row)) // 2)
-            if i%2 == 1:
-                padded_row = [''] + padded_row
-            for cell in padded_row:
-                if isinstance(cell, tuple):
-                    char, color = cell
-                    if color == 'R':
-                        board_string += Fore.RED + char + Style.RESET_ALL + " "
-                    elif color == 'G':
-                        board_string += Fore.GREEN + char + Style.RESET_ALL + " "
-                    elif color == 'Y':
-                        board_string += Fore.YELLOW + char + Style.RESET_ALL + " "
-                    elif color == 'B':
-                        board_string += Fore.BLUE + char + Style.RESET_ALL + " "
-                    elif color == 'Black':
-                        board_string += Fore.BLACK + char + Style.RESET_ALL + " "
-                else:
-                    board_string += cell + "  "
-            board_string += "\n"
-        return board_string
-    
+        # The rendering is cached, boards are not modified once built
+        if not BoardDivercite.RENDER:
+            return ""
+        if self._rendering is None:
+            parts = list(BoardDivercite.EMPTY_RENDERING)
+            for pos, piece in self.env.items():
+                parts[BoardDivercite.RENDERING_INDEX[pos]] = BoardDivercite.PIECE_RENDERING[piece.piece_type]
+            self._rendering = "".join(parts)
+        return self._rendering
+
+    @staticmethod
+    def render_cell(cell: tuple|str) -> str:
+        """
+        Render a cell of the grid given by get_grid.
+
+        Args:
+            cell (tuple|str): The cell, (char, color) or a blank string.
+
+        Returns:
+            str: The colored cell.
+        """
+        if isinstance(cell, tuple):
+            char, color = cell
+            return BoardDivercite.FORE_COLORS.get(color, BoardDivercite.OTHER_FORE_COLOR) + char + Style.RESET_ALL + " "
+        return cell + "  "
+
     # def __str__(self):
     #     grid_data = self.get_grid()
     #     board_string = ""
@@ -138,38 +179,30 @@ class BoardDivercite(Board):
         Returns:
             str: The nice representation of the board.
         """
-        grid_data = [
-            [0, 0, 0, 0, 2, 0, 0, 0, 0],
-            [0, 0, 0, 2, 1, 2, 0, 0, 0],
-            [0, 0, 2, 1, 2, 1, 2, 0, 0],
-            [0, 2, 1, 2, 1, 2, 1, 2, 0],
-            [2, 1, 2, 1, 2, 1, 2, 1, 2],
-            [0, 2, 1, 2, 1, 2, 1, 2, 0],
-            [0, 0, 2, 1, 2, 1, 2, 0, 0],
-            [0, 0, 0, 2, 1, 2, 0, 0, 0],
-            [0, 0, 0, 0, 2, 0, 0, 0, 0],
-        ]
-        for i in range(self.dimensions[0]):
-            for j in range(self.dimensions[1]):
-                if (i,j) in self.env:
-                    piece_type = self.env[(i,j)].get_type()
-                    piece_color, piece_res_city = piece_type[0], piece_type[1]
-                    if piece_res_city == "C" and piece_type[2] == 'W':
-                        char = "🅆"
-                    elif piece_res_city == "C" and piece_type[2] == 'B':
-                        char = "🄱"
-                    else:
-                        char = "◆ "
-                    grid_data[i][j] = (char, piece_color)
-                elif BoardDivercite.BOARD_MASK[i][j] == 'C':
-                    grid_data[i][j] = ("▢ ", "Black")
-                elif BoardDivercite.BOARD_MASK[i][j] == 'R':
-                    grid_data[i][j] = ("◇ ", "Black")
-                else:
-                    grid_data[i][j] = " "
-         
+        grid_data = [row[:] for row in BoardDivercite.EMPTY_GRID]
+        for (i, j), piece in self.env.items():
+            grid_data[i][j] = BoardDivercite.piece_cell(piece.piece_type)
         return grid_data
     
+    @staticmethod
+    def piece_cell(piece_type: str) -> tuple:
+        """
+        Return the grid cell of a piece.
+
+        Args:
+            piece_type (str): The type of the piece (e.g. "RCW").
+
+        Returns:
+            tuple: The char and the color of the piece.
+        """
+        if piece_type[1] == 'C' and piece_type[2] == 'W':
+            char = "🅆"
+        elif piece_type[1] == 'C' and piece_type[2] == 'B':
+            char = "🄱"
+        else:
+            char = "◆ "
+        return (char, piece_type[0])
+
     def rotate_grid_45(self, grid_data: List[List[tuple|str]]) -> List[List[tuple|str]]:
         """
         Rotate the grid by 45 degrees.
@@ -191,7 +224,7 @@ class BoardDivercite(Board):
                 if i%2 == 0:
                     rot_grid[i][j] = grid_data[i//2+n//2-j][j+i//2]
                 else:
-                    if j != 4:
+                    if j != n//2:
                         rot_grid[i][j] = grid_data[i//2+n//2-j][j+1+i//2]
 
         return rot_grid
@@ -217,5 +250,51 @@ class BoardDivercite(Board):
         for x,y in d["env"].items():
             # TODO eval is unsafe
             del dd["env"][x]
-            dd["env"][eval(x)] = Piece.from_json(json.dumps(y))
+            dd["env"][eval(x)] = PieceDivercite.from_json(json.dumps(y))
         return cls(**dd)
+
+
+# In-board neighbours of each in-board cell, in the order of get_neighbours
+BoardDivercite.NEIGHBOURS = {
+    (i, j): tuple((x, y) for x, y in ((i-1, j), (i, j-1), (i, j+1), (i+1, j))
+                  if 0 <= x < len(BoardDivercite.FORBIDDEN_MASK) and 0 <= y < len(BoardDivercite.FORBIDDEN_MASK[0])
+                  and not BoardDivercite.FORBIDDEN_MASK[x][y])
+    for i in range(len(BoardDivercite.FORBIDDEN_MASK)) for j in range(len(BoardDivercite.FORBIDDEN_MASK[0]))
+    if not BoardDivercite.FORBIDDEN_MASK[i][j]
+}
+
+# Grid of the empty board, see get_grid
+BoardDivercite.EMPTY_GRID = [
+    [("▢ ", "Black") if cell == 'C' else ("◇ ", "Black") if cell == 'R' else " " for cell in row]
+    for row in BoardDivercite.BOARD_MASK
+]
+
+
+def _rendering_layout() -> Tuple[List[str], Dict[Tuple[int, int], int]]:
+    # Lays out the rotated board once: the rendering of the empty board and the index of each cell in it
+    n_rows, n_columns = len(BoardDivercite.BOARD_MASK), len(BoardDivercite.BOARD_MASK[0])
+    positions = [[(i, j) if not BoardDivercite.FORBIDDEN_MASK[i][j] else " " for j in range(n_columns)] for i in range(n_rows)]
+    rotated_grid = BoardDivercite.rotate_grid_45(None, positions)
+    parts, index = ["\n"], {}
+    max_len = max(len(row) for row in rotated_grid)
+    for i, row in enumerate(rotated_grid):
+        if all(cell == ' ' for cell in row):
+            continue
+        padded_row = [' '] * ((max_len - len(row)) // 2) + row + [' '] * ((max_len - len(row)) // 2)
+        if i%2 == 1:
+            padded_row = [''] + padded_row
+        for cell in padded_row:
+            if isinstance(cell, tuple):
+                index[cell] = len(parts)
+                parts.append(BoardDivercite.render_cell(BoardDivercite.EMPTY_GRID[cell[0]][cell[1]]))
+            else:
+                parts.append(BoardDivercite.render_cell(cell))
+        parts.append("\n")
+    return parts, index
+
+
+BoardDivercite.EMPTY_RENDERING, BoardDivercite.RENDERING_INDEX = _rendering_layout()
+BoardDivercite.PIECE_RENDERING = {
+    color + kind + owner: BoardDivercite.render_cell(BoardDivercite.piece_cell(color + kind + owner))
+    for color in BOARD_CONFIG.colors for kind in "CR" for owner in "WB"
+}
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import inspect
+import math
+import os
+from itertools import combinations_with_replacement
+from typing import Dict, List, Tuple
+
+from board_divercite import BoardDivercite
+from game_state_divercite import GameStateDivercite
+from piece_divercite import COLORS, PieceDivercite
+from table_cache import load_tables
+
+# The neighbours of a city are encoded by the number of neighbours of each color, in base 5
+NEIGHBOUR_CODE = [5 ** k for k in range(len(COLORS))]
+N_CODES = 5 ** len(COLORS)
+# Checks every evaluation of an accumulator against a full recompute (debug mode)
+CHECK_ACCUMULATOR = bool(os.environ.get("DIVERCITE_CHECK_ACCUMULATOR"))
+
+
+class CityTables:
+    """
+    The per-city terms of the state heuristic of 2000.py, precomputed for every city color and every multiset
+    of neighbour colors. A city term only depends on its owner, its color and its neighbour colors, so the
+    state heuristic becomes a sum of table lookups over the cities, which a CityAccumulator kept on the states
+    updates with the cities changed by each move.
+
+    The terms are summed exactly and rounded once (the terms are also kept as integer multiples of `unit`), so
+    the evaluation does not depend on the order of the cities. It may differ from the full heuristic of 2000.py,
+    which rounds after each city, in the last bits for weights that are not exact binary fractions.
+
+    Tables are built from the heuristic of a player with given weights, so they match it exactly.
+    Use `CityTables.get`, which builds the tables once per player class and weights and keeps them in a file
+    until the sources of the player change (see table_cache.py).
+
+    Attributes:
+        my_city (List[float]): Term added to our score for one of our cities.
+        opponent_city (List[float]): Term added to our score for a city of the opponent.
+        opponent_own_city (List[float]): Term added to the opponent score for one of its cities.
+        unit (int): The inverse of the unit of the exact terms, a power of 2.
+        exact_terms (List[Tuple[int, int, int]]): The three terms of each city, as integer multiples of 1 / unit.
+    """
+
+    _instances: Dict[Tuple[type, tuple], CityTables] = {}
+
+    def __init__(self, player) -> None:
+        weights = player.weights
+        size = len(COLORS) * N_CODES
+        self.my_city: List[float] = [0] * size
+        self.opponent_city: List[float] = [0] * size
+        self.opponent_own_city: List[float] = [0] * size
+
+        center = next(pos for pos, cells in BoardDivercite.NEIGHBOURS.items()
+                      if len(cells) == 4 and BoardDivercite.BOARD_MASK[pos[0]][pos[1]] == 'C')
+        neighbour_cells = BoardDivercite.NEIGHBOURS[center]
+        dim = [len(BoardDivercite.BOARD_MASK), len(BoardDivercite.BOARD_MASK[0])]
+        for color_index, color in enumerate(COLORS):
+            city = PieceDivercite.get(color + "C" + player.piece_type, player.get_id())
+            for n in range(len(neighbour_cells) + 1):
+                for neighbour_colors in combinations_with_replacement(range(len(COLORS)), n):
+                    env = {center: city}
+                    for pos, neighbour_color in zip(neighbour_cells, neighbour_colors):
+                        env[pos] = PieceDivercite.get(COLORS[neighbour_color] + "R" + player.piece_type, player.get_id())
+                    board = BoardDivercite(env=env, dim=dim)
+                    k = color_index * N_CODES + sum(NEIGHBOUR_CODE[c] for c in neighbour_colors)
+                    self.my_city[k] = player.evaluate_my_city((city, center), board) * weights.my_city_factor
+                    self.opponent_city[k] = player.evaluate_opponent_city((city, center), board)
+                    self.opponent_own_city[k] = player.evaluate_my_city((city, center), board) * weights.opponent_city_factor
+
+        terms = list(zip(self.my_city, self.opponent_city, self.opponent_own_city))
+        self.unit = max(float(term).as_integer_ratio()[1] for city_terms in terms for term in city_terms)
+        self.exact_terms: List[Tuple[int, int, int]] = [tuple(self.exact(term) for term in city_terms) for city_terms in terms]
+
+    def exact(self, value: float) -> int:
+        # The value as an integer multiple of 1 / unit, exact for the terms and the scores
+        numerator, denominator = float(value).as_integer_ratio()
+        return numerator * (self.unit // denominator)
+
+    @classmethod
+    def get(cls, player) -> CityTables:
+        """
+        Return the tables of a player, read from the table cache or built once per player class and weights.
+
+        Args:
+            player: A player of 2000.py (or of a subclass).
+
+        Returns:
+            CityTables: The tables of the player.
+        """
+        key = (type(player), tuple(player.weights.to_vector()))
+        tables = cls._instances.get(key)
+        if tables is None:
+            player_class = type(player)
+            sources = [__file__, inspect.getfile(BoardDivercite), inspect.getfile(PieceDivercite)]
+            for base in player_class.__mro__:
+                try:
+                    sources.append(inspect.getfile(base))
+                except TypeError:
+                    pass
+            tables = cls._instances[key] = load_tables(
+                f"city_tables-{player_class.__module__}.{player_class.__qualname__}", sources, (COLORS, key[1]), lambda: cls(player))
+        return tables
+
+    def accumulate(self, state: GameStateDivercite) -> CityAccumulator:
+        """
+        Return the accumulator of the city terms of a state, computed from scratch if the state has none for
+        these tables. The states played from it then derive their own accumulator.
+
+        Args:
+            state (GameStateDivercite): The state.
+
+        Returns:
+            CityAccumulator: The accumulator of the state.
+        """
+        accumulator = state._accumulator
+        if accumulator is None or accumulator.tables is not self:
+            accumulator = state._accumulator = CityAccumulator.from_env(self, state.rep.env)
+        return accumulator
+
+    def state_heuristic(self, state: GameStateDivercite, player_id: int, opponent_id: int, opponent_factor: float) -> float:
+        """
+        Evaluate a state with its accumulator if it has one, or else with table lookups over its cities.
+
+        Args:
+            state (GameStateDivercite): The state to evaluate.
+            player_id (int): The ID of the player evaluating the state.
+            opponent_id (int): The ID of the opponent.
+            opponent_factor (float): Factor applied to the opponent score.
+
+        Returns:
+            float: The evaluation of the state.
+        """
+        accumulator = state._accumulator
+        if accumulator is None or accumulator.tables is not self:
+            return self.full_state_heuristic(state, player_id, opponent_id, opponent_factor)
+        value = accumulator.state_heuristic(state, player_id, opponent_id, opponent_factor)
+        if CHECK_ACCUMULATOR:
+            full_value = self.full_state_heuristic(state, player_id, opponent_id, opponent_factor)
+            assert value == full_value, f"Accumulated evaluation {value} != full evaluation {full_value} at step {state.step}"
+        return value
+
+    def full_state_heuristic(self, state: GameStateDivercite, player_id: int, opponent_id: int, opponent_factor: float) -> float:
+        """
+        Evaluate a state with table lookups over all its cities.
+
+        Args:
+            state (GameStateDivercite): The state to evaluate.
+            player_id (int): The ID of the player evaluating the state.
+            opponent_id (int): The ID of the opponent.
+            opponent_factor (float): Factor applied to the opponent score.
+
+        Returns:
+            float: The evaluation of the state.
+        """
+        neighbours = BoardDivercite.NEIGHBOURS
+        my_city, opponent_city, opponent_own_city = self.my_city, self.opponent_city, self.opponent_own_city
+        env = state.rep.env
+        score = [state.scores[player_id]]
+        opponent_score = [state.scores[opponent_id]]
+        for pos, piece in env.items():
+            if piece.is_city:
+                k = piece.color_index * N_CODES
+                for cell in neighbours[pos]:
+                    neighbour = env.get(cell)
+                    if neighbour is not None:
+                        k += NEIGHBOUR_CODE[neighbour.color_index]
+                if piece.owner_id == player_id:
+                    score.append(my_city[k])
+                else:
+                    score.append(opponent_city[k])
+                    opponent_score.append(opponent_own_city[k])
+        return math.fsum(score) - math.fsum(opponent_score) * opponent_factor
+
+
+class CityAccumulator:
+    """
+    Exact sums of the city terms of CityTables of the cities of each owner, kept on a game state. Playing a piece
+    only changes the terms of the piece if it is a city and of the cities next to it, so the accumulator of the
+    next state is derived from the one of the state in constant time, and so is the evaluation.
+
+    Attributes:
+        tables (CityTables): The tables of the terms.
+        sums (Dict[int, Tuple[int, int, int]]): For each owner, the sums of the three terms of its cities, as
+            integer multiples of 1 / tables.unit.
+    """
+
+    __slots__ = ("tables", "sums")
+
+    def __init__(self, tables: CityTables, sums: Dict[int, Tuple[int, int, int]]) -> None:
+        self.tables = tables
+        self.sums = sums
+
+    @classmethod
+    def from_env(cls, tables: CityTables, env: dict) -> CityAccumulator:
+        """
+        Sum the city terms of a board.
+
+        Args:
+            tables (CityTables): The tables of the terms.
+            env (dict): The pieces of the board, by position.
+
+        Returns:
+            CityAccumulator: The accumulator of the board.
+        """
+        sums = {}
+        for pos, piece in env.items():
+            if piece.is_city:
+                k = piece.color_index * N_CODES
+                for cell in BoardDivercite.NEIGHBOURS[pos]:
+                    neighbour = env.get(cell)
+                    if neighbour is not None:
+                        k += NEIGHBOUR_CODE[neighbour.color_index]
+                my, opponent, opponent_own = sums.get(piece.owner_id, (0, 0, 0))
+                term_my, term_opponent, term_opponent_own = tables.exact_terms[k]
+                sums[piece.owner_id] = (my + term_my, opponent + term_opponent, opponent_own + term_opponent_own)
+        return cls(tables, sums)
+
+    def play(self, env: dict, position: Tuple[int, int], piece: PieceDivercite) -> CityAccumulator:
+        """
+        Return the accumulator of the board after placing a piece.
+
+        Args:
+            env (dict): The pieces of the board before the move, by position.
+            position (Tuple[int, int]): The position of the piece.
+            piece (PieceDivercite): The piece placed.
+
+        Returns:
+            CityAccumulator: The accumulator after the move.
+        """
+        exact_terms = self.tables.exact_terms
+        neighbours = BoardDivercite.NEIGHBOURS
+        get = env.get
+        sums = dict(self.sums)
+        code = NEIGHBOUR_CODE[piece.color_index]
+        k = piece.color_index * N_CODES
+        for cell in neighbours[position]:
+            neighbour = get(cell)
+            if neighbour is None:
+                continue
+            k += NEIGHBOUR_CODE[neighbour.color_index]
+            if neighbour.is_city:
+                # the neighbour city gains a neighbour of the color of the piece
+                k_city = neighbour.color_index * N_CODES
+                for city_cell in neighbours[cell]:
+                    city_neighbour = get(city_cell)
+                    if city_neighbour is not None:
+                        k_city += NEIGHBOUR_CODE[city_neighbour.color_index]
+                old, new = exact_terms[k_city], exact_terms[k_city + code]
+                my, opponent, opponent_own = sums[neighbour.owner_id]
+                sums[neighbour.owner_id] = (my + new[0] - old[0], opponent + new[1] - old[1], opponent_own + new[2] - old[2])
+        if piece.is_city:
+            my, opponent, opponent_own = sums.get(piece.owner_id, (0, 0, 0))
+            term_my, term_opponent, term_opponent_own = exact_terms[k]
+            sums[piece.owner_id] = (my + term_my, opponent + term_opponent, opponent_own + term_opponent_own)
+        return CityAccumulator(self.tables, sums)
+
+    def state_heuristic(self, state: GameStateDivercite, player_id: int, opponent_id: int, opponent_factor: float) -> float:
+        """
+        Evaluate the state of the accumulator, identical to CityTables.full_state_heuristic.
+
+        Args:
+            state (GameStateDivercite): The state of the accumulator.
+            player_id (int): The ID of the player evaluating the state.
+            opponent_id (int): The ID of the opponent.
+            opponent_factor (float): Factor applied to the opponent score.
+
+        Returns:
+            float: The evaluation of the state.
+        """
+        unit = self.tables.unit
+        my, _, _ = self.sums.get(player_id, (0, 0, 0))
+        _, opponent, opponent_own = self.sums.get(opponent_id, (0, 0, 0))
+        score = (self.tables.exact(state.scores[player_id]) + my + opponent) / unit
+        opponent_score = (self.tables.exact(state.scores[opponent_id]) + opponent_own) / unit
+        return score - opponent_score * opponent_factor
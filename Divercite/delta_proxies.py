@@ -0,0 +1,140 @@
+import json
+
+from loguru import logger
+from seahorse.game.action import Action
+from seahorse.game.heavy_action import HeavyAction
+from seahorse.game.io_stream import EventMaster
+from seahorse.player.player import Player
+from seahorse.player.proxies import LocalPlayerProxy, RemotePlayerProxy
+from seahorse.utils.custom_exceptions import ActionNotPermittedError
+
+from game_state_divercite import GameStateDivercite, encode_move
+
+# Delta protocol between a host (DeltaRemotePlayerProxy) and a connected player (DeltaLocalPlayerProxy):
+#   host -> player "turn": the full state the first time (or on resync), then {"moves": [...], "hash": ..., "remaining_time": ...}
+#                          with the moves played since the last move of the player and the hash of the resulting state
+#   player -> host "delta_action": {"move": ..., "hash": ...} with the move played and the hash of the new state,
+#                                  or {"resync": true} when the moves do not lead to the expected state
+# Moves are encoded with encode_move and hashes are given by GameStateDivercite.state_hash.
+
+
+def played_move(state: GameStateDivercite, next_state: GameStateDivercite) -> int:
+    """
+    Return the move leading from a state to the next one.
+
+    Args:
+        state (GameStateDivercite): The state before the move.
+        next_state (GameStateDivercite): The state after the move.
+
+    Returns:
+        int: The encoded move.
+    """
+    env = state.get_rep().get_env()
+    pos, piece = next((pos, piece) for pos, piece in next_state.get_rep().get_env().items() if pos not in env)
+    return encode_move(piece.piece_type[:2], pos)
+
+
+class DeltaRemotePlayerProxy(RemotePlayerProxy):
+    """
+    Proxy of a remote player, on the host, exchanging moves and state hashes instead of full states.
+    The full state is only sent on the first turn and when the remote player asks for it.
+
+    Attributes:
+        mimics (type[Player]): The player type to mimic.
+        sid: The session ID.
+    """
+
+    def __init__(self, mimics: type[Player], *args, **kwargs) -> None:
+        super().__init__(mimics, *args, **kwargs)
+        self._known_state = None
+
+    async def play(self, current_state: GameStateDivercite, remaining_time: int) -> Action:
+        """
+        Send the turn to the remote player and rebuild its action from the move received.
+
+        Args:
+            current_state (GameStateDivercite): The current game state.
+            remaining_time (int): The remaining time of the player.
+
+        Returns:
+            Action: The action of the remote player.
+        """
+        master = EventMaster.get_instance()
+        known_state = self._known_state
+        if known_state is not None and current_state.step == known_state.step + 1:
+            turn = {"moves": [played_move(known_state, current_state)], "hash": current_state.state_hash(), "remaining_time": remaining_time}
+        else:
+            turn = {**current_state.to_json(), "remaining_time": remaining_time}
+        while True:
+            await master.sio.emit("turn", json.dumps(turn, default=lambda x: x.to_json()), to=self.sid)
+            reply = json.loads(await master.wait_for_event(self.sid, "delta_action"))
+            if "move" in reply:
+                if reply["move"] not in current_state.get_possible_moves():
+                    raise ActionNotPermittedError()
+                next_state = current_state.apply_move(reply["move"])
+                if next_state.state_hash() == reply["hash"]:
+                    self._known_state = next_state
+                    return HeavyAction(current_state, next_state)
+                logger.warning("The state of the remote player differs from ours, sending the full state")
+            turn = {**current_state.to_json(), "remaining_time": remaining_time}
+
+
+class DeltaLocalPlayerProxy(LocalPlayerProxy):
+    """
+    Proxy of a local player connected to a host using DeltaRemotePlayerProxy. The state is kept between turns
+    and updated with the moves received.
+
+    Attributes:
+        wrapped_player (Player): The wrapped player object.
+    """
+
+    def __init__(self, wrapped_player: Player, gs: type = GameStateDivercite) -> None:
+        super().__init__(wrapped_player, gs=gs)
+        self._state = None
+
+        @self.sio.on("turn")
+        async def handle_turn(*data):
+            logger.info(f"{self.wrapped_player.name} is playing")
+            turn = json.loads(data[0])
+            if "moves" in turn:
+                state = self._state
+                if state is not None:
+                    for move in turn["moves"]:
+                        state = state.apply_move(move)
+                if state is None or state.state_hash() != turn["hash"]:
+                    logger.warning("Our state differs from the one of the host, asking for the full state")
+                    await self.sio.emit("delta_action", json.dumps({"resync": True}))
+                    return
+            else:
+                state = gs.from_json(data[0], next_player=self)
+            action = await self.play(state, remaining_time=turn["remaining_time"])
+            logger.info(f"{self.wrapped_player} played the following action : \n{action}")
+
+    async def play(self, current_state: GameStateDivercite, remaining_time: int) -> Action:
+        """
+        Play a move and send it to the host with the hash of the new state.
+
+        Args:
+            current_state (GameStateDivercite): The current game state.
+            remaining_time (int): The remaining time of the player.
+
+        Returns:
+            Action: The action resulting from the move.
+        """
+        action = await self.next_action(current_state, remaining_time)
+        self._state = action.get_next_game_state()
+        await self.sio.emit("delta_action", json.dumps({"move": played_move(current_state, self._state), "hash": self._state.state_hash()}))
+        return action
+
+    async def next_action(self, current_state: GameStateDivercite, remaining_time: int) -> Action:
+        """
+        Compute the action of the player.
+
+        Args:
+            current_state (GameStateDivercite): The current game state.
+            remaining_time (int): The remaining time of the player.
+
+        Returns:
+            Action: The action.
+        """
+        return self.compute_action(current_state=current_state, remaining_time=remaining_time).get_heavy_action(current_state)
@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from argparse import RawTextHelpFormatter
+from typing import Dict, List, Optional
+
+# A corpus is a list of games, each a dict with:
+#   "moves": [[piece, [i, j]], ...]   the moves played, e.g. ["RC", [4, 5]]
+#   "scores": [[s1, s2], ...]          optional, the scores of the players (in playing order) after each move
+# Games are replayed by each engine in its own process, so engines can be different versions of the same modules
+# (e.g. a git worktree of another commit).
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def moves_of_states(states: list) -> List[list]:
+    """
+    Return the moves of a game given by its successive states.
+
+    Args:
+        states (list): The successive states of the game.
+
+    Returns:
+        List[list]: The moves, as [piece, [i, j]].
+    """
+    moves = []
+    for state, next_state in zip(states, states[1:]):
+        env = state.get_rep().get_env()
+        pos, piece = next((pos, piece) for pos, piece in next_state.get_rep().get_env().items() if pos not in env)
+        moves.append([piece.piece_type[:2], list(pos)])
+    return moves
+
+
+def recorded_corpus(paths: List[str]) -> List[dict]:
+    """
+    Read the games recorded with -r, with their recorded scores.
+
+    Args:
+        paths (List[str]): The recorded games (json).
+
+    Returns:
+        List[dict]: The games of the corpus.
+    """
+    from position_dataset import recorded_games
+
+    corpus = []
+    for states, player_ids in recorded_games(paths):
+        corpus.append({"moves": moves_of_states(states),
+                       "scores": [[state.scores[player_id] for player_id in player_ids] for state in states[1:]]})
+    return corpus
+
+
+def replay_corpus(paths: List[str]) -> List[dict]:
+    """
+    Read the games of replays written by replay_log.py, with their recorded scores.
+
+    Args:
+        paths (List[str]): The replays (jsonl).
+
+    Returns:
+        List[dict]: The games of the corpus.
+    """
+    corpus = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                if "game" in record:
+                    player_ids = [str(player["id"]) for player in record["players"]]
+                    game = {"moves": [], "scores": []}
+                    corpus.append(game)
+                elif "move" in record:
+                    game["moves"].append([record["move"][:2], record["position"]])
+                    game["scores"].append([record["scores"][player_id] for player_id in player_ids])
+    return corpus
+
+
+def self_play_corpus(n_games: int, seed: int) -> List[dict]:
+    """
+    Play games with uniformly random moves.
+
+    Args:
+        n_games (int): The number of games.
+        seed (int): The seed of the games.
+
+    Returns:
+        List[dict]: The games of the corpus, without scores.
+    """
+    from game_state_divercite import GameStateDivercite
+    from player_divercite import PlayerDivercite
+
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_games):
+        state = GameStateDivercite.initial_state([PlayerDivercite("W", name="player_1"), PlayerDivercite("B", name="player_2")])
+        moves = []
+        while not state.is_done():
+            action = rng.choice(sorted(state.generate_possible_light_actions(), key=str))
+            moves.append([action.data["piece"], list(action.data["position"])])
+            state = state.apply_action(action)
+        corpus.append({"moves": moves})
+    return corpus
+
+
+def run_engine(corpus: List[dict]) -> dict:
+    """
+    Replay a corpus with the modules found on sys.path. Only the interface shared by every version of the
+    engine is used: the constructor, apply_action and generate_possible_light_actions.
+
+    Args:
+        corpus (List[dict]): The games to replay.
+
+    Returns:
+        dict: For each game and each step the scores and a digest of the legal moves, and the time spent
+            applying moves and generating them.
+    """
+    from board_divercite import BoardDivercite
+    from game_state_divercite import GameStateDivercite
+    from player_divercite import PlayerDivercite
+    from seahorse.game.light_action import LightAction
+    try:
+        from board_config import BOARD_CONFIG
+        size, colors = BOARD_CONFIG.size, BOARD_CONFIG.colors
+        n_pieces = {"R": BOARD_CONFIG.n_resource_pieces, "C": BOARD_CONFIG.n_city_pieces}
+    except ImportError:
+        # engines older than the board configs only play the standard game
+        size, colors, n_pieces = 9, "RGBY", {"R": 3, "C": 2}
+
+    games = []
+    apply_time = moves_time = 0.
+    for game in corpus:
+        players = [PlayerDivercite("W", name="player_1"), PlayerDivercite("B", name="player_2")]
+        state = GameStateDivercite(
+            scores={player.get_id(): 0 for player in players}, next_player=players[0], players=players,
+            rep=BoardDivercite(env={}, dim=[size, size]), step=0,
+            players_pieces_left={player.get_id(): {c+t: n_pieces[t] for c in colors for t in "CR"} for player in players})
+        steps = []
+        for piece, position in game["moves"]:
+            start = time.perf_counter()
+            legal_moves = list(state.generate_possible_light_actions())
+            moves_time += time.perf_counter() - start
+            digest = hashlib.sha1(" ".join(sorted(f"{a.data['piece']}{tuple(a.data['position'])}" for a in legal_moves)).encode()).hexdigest()
+            action = LightAction({"piece": piece, "position": tuple(position)})
+            start = time.perf_counter()
+            state = state.apply_action(action)
+            apply_time += time.perf_counter() - start
+            steps.append([[state.scores[player.get_id()] for player in players], digest])
+        games.append(steps)
+    return {"games": games, "apply_time": apply_time, "moves_time": moves_time}
+
+
+def replay_with(engine_dir: str, corpus: List[dict]) -> dict:
+    """
+    Replay a corpus with the engine of a directory, in a new process.
+
+    Args:
+        engine_dir (str): The directory of the engine modules.
+        corpus (List[dict]): The games to replay.
+
+    Returns:
+        dict: The output of run_engine.
+    """
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-engine", engine_dir],
+                             input=json.dumps(corpus), capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"The engine of {engine_dir} failed:\n{process.stderr}")
+    return json.loads(process.stdout)
+
+
+def compare(corpus: List[dict], reference: dict, result: dict) -> Optional[str]:
+    """
+    Compare the replay of an engine with the recorded scores of the corpus, or else with a reference replay.
+
+    Args:
+        corpus (List[dict]): The replayed games.
+        reference (dict): The replay of the reference engine.
+        result (dict): The replay of the engine to check.
+
+    Returns:
+        Optional[str]: The description of the first difference, None if there is none.
+    """
+    for k, (game, expected_steps, steps) in enumerate(zip(corpus, reference["games"], result["games"])):
+        for step, (expected, got) in enumerate(zip(expected_steps, steps)):
+            expected_scores = game["scores"][step] if "scores" in game else expected[0]
+            if got[0] != expected_scores:
+                return f"game {k}, step {step + 1} ({game['moves'][step]}): scores {got[0]} instead of {expected_scores}"
+            if got[1] != expected[1]:
+                return f"game {k}, step {step + 1}: the legal moves differ"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="engine_regression.py",
+                        description="Replays a corpus of games with one or more engines, checks that the scores and the legal moves\n"
+                                    "are identical at every step and times each engine.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-e", "--engines", nargs="*", default=[ENGINE_DIR],
+                        help="Directories of the engines, the first one is the reference (default is this directory).\n\n")
+    parser.add_argument("--records", nargs="*", default=[], help="Games recorded with -r (json).\n\n")
+    parser.add_argument("--replays", nargs="*", default=[], help="Replays written by replay_log.py (jsonl).\n\n")
+    parser.add_argument("--self-play", type=int, default=0, help="The number of random games added to the corpus.\n\n")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games.\n\n")
+    parser.add_argument("--corpus", default=None, help="Corpus file (json) read, if it exists, or else written with the games above.\n\n")
+    parser.add_argument("--run-engine", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_engine:
+        sys.path.insert(0, args.run_engine)
+        json.dump(run_engine(json.load(sys.stdin)), sys.stdout)
+        sys.exit(0)
+
+    if args.corpus and os.path.exists(args.corpus):
+        with open(args.corpus) as f:
+            corpus = json.load(f)
+    else:
+        corpus = recorded_corpus(args.records) + replay_corpus(args.replays) + self_play_corpus(args.self_play, args.seed)
+        if args.corpus:
+            with open(args.corpus, "w") as f:
+                json.dump(corpus, f)
+    if not corpus:
+        parser.error("the corpus is empty, give recorded games, replays, random games or a corpus file")
+
+    results: Dict[str, dict] = {}
+    failed = False
+    for engine_dir in args.engines:
+        result = results[engine_dir] = replay_with(engine_dir, corpus)
+        difference = compare(corpus, results[args.engines[0]], result)
+        failed |= difference is not None
+        print(f"{engine_dir}: apply {result['apply_time']:.3f}s, move generation {result['moves_time']:.3f}s, "
+              + ("OK" if difference is None else "DIFFERENT - " + difference))
+    print(f"{len(corpus)} games, {sum(len(game['moves']) for game in corpus)} moves")
+    sys.exit(1 if failed else 0)
@@ -1,9 +1,12 @@
 import copy
 import json
 import random
-from typing import Dict, Generator, List, Optional, Set, Tuple
+from typing import Callable, Dict, Generator, List, NamedTuple, Optional, Set, Tuple
 
+from board_config import BOARD_CONFIG
 from board_divercite import BoardDivercite
+from piece_divercite import COLORS, PIECE_INDEX, PIECE_TYPES, PieceDivercite
+from pieces_left_divercite import PiecesLeft
 from player_divercite import PlayerDivercite
 from seahorse.game.game_layout.board import Piece
 from seahorse.game.game_state import GameState
@@ -12,6 +15,112 @@ from seahorse.game.light_action import LightAction
 from seahorse.player.player import Player
 from seahorse.utils.serializer import Serializable
 
+N_COLUMNS = len(BoardDivercite.BOARD_MASK[0])
+N_CELLS = len(BoardDivercite.BOARD_MASK) * N_COLUMNS
+CITY_CELLS = tuple(i * N_COLUMNS + j for i, row in enumerate(BoardDivercite.BOARD_MASK) for j, cell in enumerate(row) if cell == 'C')
+RESOURCE_CELLS = tuple(i * N_COLUMNS + j for i, row in enumerate(BoardDivercite.BOARD_MASK) for j, cell in enumerate(row) if cell == 'R')
+CITY_CELL_SET = frozenset(CITY_CELLS)
+PIECE_IS_CITY = tuple(piece[1] == "C" for piece in PIECE_TYPES)
+CITY_POSITIONS = tuple(divmod(cell, N_COLUMNS) for cell in CITY_CELLS)
+DIVERCITE_VALUES = {color: 5 for color in COLORS}
+PIECE_COLOR_INDEX = tuple(COLORS.index(piece[0]) for piece in PIECE_TYPES)
+# Cell indices of the in-board neighbours of each cell, in the order of get_neighbours
+NEIGHBOUR_CELLS = tuple(tuple(i * N_COLUMNS + j for i, j in BoardDivercite.NEIGHBOURS.get(divmod(cell, N_COLUMNS), ()))
+                        for cell in range(N_CELLS))
+
+
+class MoveScores(NamedTuple):
+    """
+    The immediate effect of every possible move of a state, see GameStateDivercite.score_moves.
+
+    Attributes:
+        moves (List[int]): The possible moves, as given by get_possible_moves.
+        points (List[int]): The points won by the player of each move.
+        opponent_points (List[int]): The points won by its opponent.
+        completed (List[bool]): Whether the move completes a divercite of the player.
+        blocked (List[bool]): Whether the move makes a divercite of the opponent impossible: a resource next to
+            an opponent city whose neighbours all have different colors, of one of these colors.
+    """
+    moves: List[int]
+    points: List[int]
+    opponent_points: List[int]
+    completed: List[bool]
+    blocked: List[bool]
+
+
+def cell_move_scores(piece_at: Callable[[int], Optional[PieceDivercite]], cell: int, player_id: int) -> List[Tuple[int, int, bool, bool]]:
+    """
+    Score a piece of each color placed on an empty cell, from the pieces around it: the points given to the
+    player and to its opponent, as compute_scores would give them (without the draw removal of the last step),
+    and whether it completes a divercite of the player or blocks one of the opponent (see MoveScores).
+
+    Args:
+        piece_at (Callable[[int], Optional[PieceDivercite]]): The piece on a cell index, None if it is empty.
+        cell (int): The index of the empty cell, a city cell is scored for cities and a resource cell for resources.
+        player_id (int): The ID of the player placing the piece.
+
+    Returns:
+        List[Tuple[int, int, bool, bool]]: The (points, opponent points, completed, blocked) of each color index.
+    """
+    if cell in CITY_CELL_SET:
+        colors = [piece.color_index for n in NEIGHBOUR_CELLS[cell] if (piece := piece_at(n)) is not None]
+        if len(set(colors)) == 4:
+            return [(5, 0, True, False)] * len(COLORS)
+        return [(colors.count(color), 0, False, False) for color in range(len(COLORS))]
+
+    scores = [[0, 0, False, False] for _ in range(len(COLORS))]
+    for city_cell in NEIGHBOUR_CELLS[cell]:
+        city = piece_at(city_cell)
+        if city is None:
+            continue
+        colors = [piece.color_index for n in NEIGHBOUR_CELLS[city_cell] if (piece := piece_at(n)) is not None]
+        distinct = set(colors)
+        mine = city.owner_id == player_id
+        for color in range(len(COLORS)):
+            if len(distinct) == 3 and color not in distinct:
+                points = 5 - (city.color_index != color)
+                scores[color][2] |= mine
+            else:
+                points = int(city.color_index == color)
+                scores[color][3] |= not mine and len(distinct) == len(colors) and color in distinct
+            scores[color][0 if mine else 1] += points
+    return [tuple(color_scores) for color_scores in scores]
+
+
+def encode_move(piece: str, position: Tuple[int, int]) -> int:
+    """
+    Encode a move as a single integer: piece index * number of cells + cell index.
+
+    Args:
+        piece (str): The type of the piece played (e.g. "RC").
+        position (Tuple[int, int]): The position of the piece.
+
+    Returns:
+        int: The encoded move.
+    """
+    return PIECE_INDEX[piece] * N_CELLS + position[0] * N_COLUMNS + position[1]
+
+
+def decode_move(move: int) -> Tuple[str, Tuple[int, int]]:
+    """
+    Decode a move encoded by `encode_move`.
+
+    Args:
+        move (int): The encoded move.
+
+    Returns:
+        Tuple[str, Tuple[int, int]]: The type of the piece played and its position.
+    """
+    return DECODED_MOVES[move]
+
+
+# Zobrist keys of each piece (with its owner color) on each cell, the same in every process
+_zobrist_random = random.Random(8175)
+ZOBRIST_KEYS = {piece + owner: [_zobrist_random.getrandbits(64) for _ in range(N_CELLS)] for piece in PIECE_TYPES for owner in "WB"}
+
+DECODED_MOVES = [(PIECE_TYPES[move // N_CELLS], divmod(move % N_CELLS, N_COLUMNS)) for move in range(len(PIECE_TYPES) * N_CELLS)]
+
+
 class GameStateDivercite(GameState):
     """
     A class representing the state of an Divercite game.
@@ -25,9 +134,37 @@ class GameStateDivercite(GameState):
     def __init__(self, scores: Dict, next_player: Player, players: List[Player], rep: BoardDivercite, step: int, 
                  players_pieces_left: dict[str: dict[str: int]],  *args, **kwargs) -> None:
         super().__init__(scores, next_player, players, rep)
-        self.max_step = 40
+        self.max_step = BOARD_CONFIG.max_step
         self.step = step
-        self.players_pieces_left = {int(a):b for a,b in players_pieces_left.items()}
+        self.players_pieces_left = {int(a):PiecesLeft.from_dict(b) for a,b in players_pieces_left.items()}
+        self._empty_cells = None
+        self._possible_moves = None
+        self._zobrist = None
+        self._accumulator = None
+        self._move_scores = None
+
+    @classmethod
+    def initial_state(cls, players: List[Player]) -> "GameStateDivercite":
+        """
+        Build the initial state of a game, before the first move.
+
+        Args:
+            players (List[Player]): The players, in playing order.
+
+        Returns:
+            GameStateDivercite: The initial game state.
+        """
+        dim = [BOARD_CONFIG.size, BOARD_CONFIG.size]
+        env = {}
+        n_resource_pieces_per_color = BOARD_CONFIG.n_resource_pieces
+        n_city_pieces_per_color = BOARD_CONFIG.n_city_pieces
+        colors = COLORS # Red, Green, Blue, Yellow in the standard game
+        city_resource_types = ["C","R"] # City, Resource
+        players_pieces_left = {player.get_id() : {c+t: (n_resource_pieces_per_color if t == "R" else n_city_pieces_per_color) 
+                                for c in colors for t in city_resource_types} for player in players}
+        init_scores = {player.get_id(): 0 for player in players}
+        return cls(scores=init_scores, next_player=players[0], players=players, rep=BoardDivercite(env=env, dim=dim),
+                   step=0, players_pieces_left=players_pieces_left)
 
     def get_step(self) -> int:
         """
@@ -90,6 +227,174 @@ class GameStateDivercite(GameState):
             if player.get_id() == pid:
                 return player
     
+    def get_zobrist(self) -> int:
+        """
+        Return the Zobrist key of the board: the xor of the keys of its pieces. It is computed from the board once,
+        then updated by each placement.
+
+        Returns:
+            int: The 64 bits key of the board.
+        """
+        if self._zobrist is None:
+            key = 0
+            for (i, j), piece in self.get_rep().get_env().items():
+                key ^= ZOBRIST_KEYS[piece.piece_type][i * N_COLUMNS + j]
+            self._zobrist = key
+        return self._zobrist
+
+    def final_score_bounds(self) -> Dict[int, Tuple[int, int]]:
+        """
+        Return bounds of the final score of each player. A score is the sum of the values of the cities of its
+        player (5 for a divercite, else the number of neighbours of the city color), plus at most 2 given by
+        remove_draw, so it never decreases. The optimistic bound lets every city reach the best value its empty
+        neighbour cells and the resources left allow, the cities left go on the best empty cells and the player
+        win the draw.
+
+        Returns:
+            Dict[int, Tuple[int, int]]: The pessimistic and optimistic final scores, by player ID.
+        """
+        env = self.get_rep().get_env()
+        resources_left = {color: sum(pieces_left[color + "R"] for pieces_left in self.players_pieces_left.values()) for color in COLORS}
+        missing_available = {color: resources_left[color] > 0 for color in COLORS}
+
+        def best_values(pos: Tuple[int, int]) -> Tuple[List[str], Dict[str, int]]:
+            # The colors around a cell and the best final value of a city of each color on it
+            cells = BoardDivercite.NEIGHBOURS[pos]
+            colors = [neighbour.color for cell in cells if (neighbour := env.get(cell)) is not None]
+            if len(cells) == 4 and len(set(colors)) == len(colors) \
+                    and sum(missing_available[c] for c in COLORS if c not in colors) >= 4 - len(colors):
+                return colors, DIVERCITE_VALUES
+            empty = len(cells) - len(colors)
+            return colors, {color: colors.count(color) + min(empty, resources_left[color]) for color in COLORS}
+
+        gains = {player_id: 2 for player_id in self.players_pieces_left}
+        empty_city_values = []
+        for pos in CITY_POSITIONS:
+            piece = env.get(pos)
+            colors, values = best_values(pos)
+            if piece is None:
+                empty_city_values.append(values)
+            else:
+                value = 5 if len(set(colors)) == 4 else colors.count(piece.color)
+                gains[piece.owner_id] += max(values[piece.color], value) - value
+        for player_id, pieces_left in self.players_pieces_left.items():
+            city_colors = [color for color in COLORS if pieces_left[color + "C"] > 0]
+            n_cities = sum(pieces_left[color + "C"] for color in COLORS)
+            if n_cities:
+                best = sorted((max(values[color] for color in city_colors) for values in empty_city_values), reverse=True)
+                gains[player_id] += sum(best[:n_cities])
+        return {player_id: (score, score + gains[player_id]) for player_id, score in self.scores.items()}
+
+    def state_hash(self) -> str:
+        """
+        Return a digest of the state that does not depend on the process, unlike hash(): the Zobrist key of the
+        board, the scores of the players in playing order and the step.
+
+        Returns:
+            str: The digest of the state.
+        """
+        scores = "-".join(str(self.scores[player.get_id()]) for player in self.players)
+        return f"{self.get_zobrist():016x}-{scores}-{self.step}"
+
+    def get_empty_cells(self) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Return the empty city cells and the empty resource cells, as cell indices in board order.
+        They are computed from the board once, then updated by each placement.
+
+        Returns:
+            Tuple[Tuple[int, ...], Tuple[int, ...]]: The empty city cells and the empty resource cells.
+        """
+        if self._empty_cells is None:
+            env = self.get_rep().get_env()
+            self._empty_cells = tuple(tuple(cell for cell in cells if divmod(cell, N_COLUMNS) not in env)
+                                      for cells in (CITY_CELLS, RESOURCE_CELLS))
+        return self._empty_cells
+
+    def get_possible_moves(self) -> List[int]:
+        """
+        Return the possible moves of the next player, encoded by `encode_move`, in the order of the light actions.
+        The list is cached and must not be modified.
+
+        Returns:
+            List[int]: The possible moves.
+        """
+        if self._possible_moves is None:
+            empty_cities, empty_resources = self.get_empty_cells()
+            moves = []
+            for piece_index, n_piece in enumerate(self.players_pieces_left[self.next_player.get_id()].counts):
+                if n_piece > 0:
+                    offset = piece_index * N_CELLS
+                    moves += [offset + cell for cell in (empty_cities if PIECE_IS_CITY[piece_index] else empty_resources)]
+            self._possible_moves = moves
+        return self._possible_moves
+
+    def score_moves(self) -> MoveScores:
+        """
+        Score every possible move of the next player at once, without building the next states: the points each
+        move gives to both players, as compute_scores would give them (without the draw removal of the last
+        step), and whether it completes or blocks a divercite. The effect of each color is computed once per
+        empty cell from the neighbour cells, then read for each piece the player has left.
+        The scores are cached and must not be modified.
+
+        Returns:
+            MoveScores: The scores of the moves.
+        """
+        if self._move_scores is None:
+            player_id = self.next_player.get_id()
+            board = [None] * N_CELLS
+            for (i, j), piece in self.get_rep().get_env().items():
+                board[i * N_COLUMNS + j] = piece
+
+            # (points, opponent points, completed, blocked) of a piece of each color, by empty cell
+            empty_cities, empty_resources = self.get_empty_cells()
+            cell_scores = {cell: cell_move_scores(board.__getitem__, cell, player_id) for cell in empty_cities + empty_resources}
+
+            moves = self.get_possible_moves()
+            move_scores = [cell_scores[move % N_CELLS][PIECE_COLOR_INDEX[move // N_CELLS]] for move in moves]
+            columns = [list(column) for column in zip(*move_scores)] or [[], [], [], []]
+            self._move_scores = MoveScores(moves, *columns)
+        return self._move_scores
+
+    def apply_move(self, move: int) -> "GameStateDivercite":
+        """
+        Play an encoded move for the next player and return the new game state.
+
+        States are never modified, so undoing a move is going back to the state it was applied to.
+
+        Args:
+            move (int): The encoded move.
+
+        Returns:
+            GameStateDivercite: The new game state.
+        """
+        piece, position = DECODED_MOVES[move]
+        return self.play(piece, position)
+
+    def move_to_heavy_action(self, move: int) -> HeavyAction:
+        """
+        Convert an encoded move to a heavy action, to send it to the master.
+
+        Args:
+            move (int): The encoded move.
+
+        Returns:
+            HeavyAction: The corresponding heavy action.
+        """
+        return HeavyAction(self, self.apply_move(move))
+
+    def move_to_light_action(self, move: int) -> LightAction:
+        """
+        Convert an encoded move to a light action.
+
+        Args:
+            move (int): The encoded move.
+
+        Returns:
+            LightAction: The corresponding light action.
+        """
+        piece, position = DECODED_MOVES[move]
+        return LightAction({"piece": piece, "position": position})
+
     def generate_possible_heavy_actions(self) -> Generator[HeavyAction, None, None]:
         """
         Generate possible actions.
@@ -97,32 +402,8 @@ class GameStateDivercite(GameState):
         Returns:
             Generator[HeavyAction]: Generator of possible heavy actions.
         """
-        current_rep = self.get_rep()
-        b = current_rep.get_env()
-        d = current_rep.get_dimensions()
-
-        for piece, n_piece in self.players_pieces_left[self.next_player.get_id()].items():
-            piece_color = piece[0]
-            piece_res_city = piece[1]
-            if n_piece > 0:
-                for i in range(d[0]):
-                    for j in range(d[1]):
-                        if self.in_board((i, j)) and (i,j) not in b and self.piece_type_match(piece_res_city, (i, j)):
-                            copy_b = copy.copy(b)
-                            copy_b[(i, j)] = Piece(piece_type=piece_color+piece_res_city+self.next_player.piece_type, owner=self.next_player)
-                            play_info = ((i,j), piece, self.next_player.get_id())
-                            yield HeavyAction(
-                                            self,
-                                            GameStateDivercite(
-                                                self.compute_scores(play_info),
-                                                self.compute_next_player(),
-                                                self.players,
-                                                BoardDivercite(env=copy_b, dim=d),
-                                                step=self.step + 1,
-                                                players_pieces_left=self.compute_players_pieces_left(play_info),
-                                            ),
-                                        )
-                            
+        for move in self.get_possible_moves():
+            yield self.move_to_heavy_action(move)
 
     def generate_possible_light_actions(self) -> Generator[LightAction, None, None]:
         """
@@ -132,20 +413,8 @@ class GameStateDivercite(GameState):
             Generator[LightAction]: Generator of possible light actions.
 
         """
-
-        current_rep = self.get_rep()
-        b = current_rep.get_env()
-        d = current_rep.get_dimensions()
-        for piece, n_piece in self.players_pieces_left[self.next_player.get_id()].items():
-            piece_color = piece[0]
-            piece_res_city = piece[1]
-            if n_piece > 0:
-                for i in range(d[0]):
-                    for j in range(d[1]):
-                        if self.in_board((i, j)) and (i,j) not in b and self.piece_type_match(piece_res_city, (i, j)):
-                            data = {"piece": piece_color+piece_res_city, "position" : (i,j)}
-                            yield LightAction(data)
-
+        for move in self.get_possible_moves():
+            yield self.move_to_light_action(move)
 
     def apply_action(self, action: LightAction) -> GameState:
         """
@@ -161,24 +430,46 @@ class GameStateDivercite(GameState):
         if not isinstance(action, LightAction):
             raise ValueError("The action must be a LightAction.")
         
-        piece, position = action.data["piece"], action.data["position"]
-        
-        current_rep = self.get_rep()
-        b = current_rep.get_env()
-        d = current_rep.get_dimensions()
-        copy_b = copy.copy(b)
-        copy_b[position] = Piece(piece_type=piece+self.next_player.get_piece_type(), owner=self.next_player)
-        new_board = BoardDivercite(env=copy_b, dim=d)
+        return self.play(action.data["piece"], tuple(action.data["position"]))
+
+    def play(self, piece: str, position: Tuple[int, int]) -> "GameStateDivercite":
+        """
+        Place a piece of the next player and return the new game state. The board of the new state only keeps the
+        piece added to the board of this state, and its empty cells, Zobrist key and evaluation accumulator (see
+        city_tables.py) are derived from the ones of this state.
+
+        Args:
+            piece (str): The type of the piece (e.g. "RC").
+            position (Tuple[int, int]): The position of the piece.
+
+        Returns:
+            GameStateDivercite: The new game state.
+        """
+        new_piece = PieceDivercite.get(piece+self.next_player.get_piece_type(), self.next_player.get_id())
         play_info = (position, piece, self.next_player.get_id())
 
-        return GameStateDivercite(
+        next_state = GameStateDivercite(
             self.compute_scores(play_info=play_info),
             self.compute_next_player(),
             self.players,
-            new_board,
+            BoardDivercite.with_piece(self.get_rep(), position, new_piece),
             step=self.step + 1,
             players_pieces_left=self.compute_players_pieces_left(play_info=play_info),
         )
+        if self._empty_cells is not None:
+            cell = position[0] * N_COLUMNS + position[1]
+            empty_cities, empty_resources = self._empty_cells
+            if piece[1] == "C":
+                k = empty_cities.index(cell)
+                next_state._empty_cells = (empty_cities[:k] + empty_cities[k+1:], empty_resources)
+            else:
+                k = empty_resources.index(cell)
+                next_state._empty_cells = (empty_cities, empty_resources[:k] + empty_resources[k+1:])
+        if self._zobrist is not None:
+            next_state._zobrist = self._zobrist ^ ZOBRIST_KEYS[new_piece.piece_type][position[0] * N_COLUMNS + position[1]]
+        if self._accumulator is not None:
+            next_state._accumulator = self._accumulator.play(self.get_rep().env, position, new_piece)
+        return next_state
 
     def convert_gui_data_to_action_data(self, gui_data: dict) -> dict:
         """
@@ -192,19 +483,19 @@ class GameStateDivercite(GameState):
         """
         return {"piece": gui_data["piece"], "position": tuple(gui_data["position"])}
 
-    def compute_players_pieces_left(self, play_info) -> dict[str: dict[str: int]]:
+    def compute_players_pieces_left(self, play_info) -> dict[int: PiecesLeft]:
         """
-        Compute the number of pieces left for each player.
+        Compute the number of pieces left for each player. The inventories are immutable and shared with the parent state.
 
         Args:
-            id_add (int): The ID of the player to add the score for.
+            play_info (tuple): The position, the piece and the ID of the player.
 
         Returns:
-            dict[str: dict[str: int]]: A dictionary with player ID as the key and score as the value.
+            dict[int: PiecesLeft]: A dictionary with player ID as the key and the pieces left as the value.
         """
         pos, piece, id_player = play_info
-        players_pieces_left = copy.deepcopy(self.players_pieces_left)
-        players_pieces_left[id_player][piece] -= 1
+        players_pieces_left = copy.copy(self.players_pieces_left)
+        players_pieces_left[id_player] = players_pieces_left[id_player].decrement(piece)
         return players_pieces_left
     
     def compute_scores(self, play_info: tuple) -> Dict[int, float]:
@@ -225,25 +516,24 @@ class GameStateDivercite(GameState):
                 scores[id_player] += 5
             else:
                 scores[id_player] += len([n for n in self.get_neighbours(pos[0], pos[1]).values() 
-                                          if isinstance(n[0], Piece) and n[0].get_type()[0] == color])
+                                          if isinstance(n[0], Piece) and n[0].color == color])
         else:            
             for n in self.get_neighbours(pos[0], pos[1]).values():
                 if isinstance(n[0], Piece):
                     if self.check_divercite(n[1], color):
-                        scores[n[0].get_owner_id()] -= int(n[0].get_type()[0] != color)
-                        scores[n[0].get_owner_id()] += 5
+                        scores[n[0].owner_id] -= int(n[0].color != color)
+                        scores[n[0].owner_id] += 5
                     else:
-                        scores[n[0].get_owner_id()] += int(n[0].get_type()[0] == color)
+                        scores[n[0].owner_id] += int(n[0].color == color)
 
         if self.step == self.max_step-1:
             # Last step, we prevent draws
             player1, player2 = self.players
             if scores[player1.get_id()] == scores[player2.get_id()]:
                 
-                env = copy.copy(self.get_rep().get_env())
                 player = self.get_player_id(id_player)
-                env[pos] = Piece(piece_type=color+res_city+player.piece_type, owner=player)
-                new_board = BoardDivercite(env=env, dim=self.get_rep().get_dimensions())
+                new_piece = PieceDivercite.get(color+res_city+player.piece_type, player.get_id())
+                new_board = BoardDivercite.with_piece(self.get_rep(), pos, new_piece)
                 return self.remove_draw(scores, new_board)
         
         return scores
@@ -265,12 +555,12 @@ class GameStateDivercite(GameState):
         
         def count_divercite(player_id: int) -> int:
             return sum([self.check_divercite((i,j), board=board) for i in range(d[0]) for j in range(d[1]) 
-                        if self.in_board((i,j)) and env.get((i,j)) and env.get((i,j)).get_type()[1] == 'C' and env[(i,j)].get_owner_id() == player_id])
+                        if self.in_board((i,j)) and env.get((i,j)) and env.get((i,j)).is_city and env[(i,j)].owner_id == player_id])
             
         
         def count_nstack(player_id, n) -> int:
-            return sum([sum([p[0].get_type()[0] == env[(i,j)].get_type()[0] for p in board.get_neighbours(i,j).values() if isinstance(p[0], Piece)]) == n 
-                        for i in range(d[0]) for j in range(d[1]) if self.in_board((i,j)) and env.get((i,j)) and env.get((i,j)).get_type()[1] == 'C' and env[(i,j)].get_owner_id() == player_id])
+            return sum([sum([p[0].color == env[(i,j)].color for p in board.get_neighbours(i,j).values() if isinstance(p[0], Piece)]) == n 
+                        for i in range(d[0]) for j in range(d[1]) if self.in_board((i,j)) and env.get((i,j)) and env.get((i,j)).is_city and env[(i,j)].owner_id == player_id])
         
         player1, player2 = self.players
         
@@ -308,7 +598,7 @@ class GameStateDivercite(GameState):
             bool: True if the position has won a divercite, False otherwise.
         """
         neighbors = self.get_neighbours(pos[0], pos[1]) if not board else board.get_neighbours(pos[0], pos[1])
-        return len(set([n[0].get_type()[0] for n in neighbors.values() if isinstance(n[0], Piece)]).union(set([piece_color]) if piece_color else {})) == 4
+        return len(set([n[0].color for n in neighbors.values() if isinstance(n[0], Piece)]).union(set([piece_color]) if piece_color else {})) == 4
     
     
     def __str__(self) -> str:
@@ -317,7 +607,7 @@ class GameStateDivercite(GameState):
         return "The game is finished!"
 
     def to_json(self) -> str:
-        return { i:j for i,j in self.__dict__.items() if i!="_possible_light_actions" and i!="_possible_heavy_actions"}
+        return { i:j for i,j in self.__dict__.items() if not i.startswith("_")}
 
     @classmethod
     def from_json(cls,data:str,*,next_player:Optional[PlayerDivercite]=None) -> Serializable:
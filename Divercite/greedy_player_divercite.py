@@ -32,14 +32,27 @@ class MyPlayer(PlayerDivercite):
         Returns:
             Action: The best action as determined by minimax.
         """
-        possible_actions = current_state.generate_possible_heavy_actions()
-        best_action = next(possible_actions)
-        best_score = best_action.get_next_game_state().scores[self.get_id()]
-
-        for action in possible_actions:
-            state = action.get_next_game_state()
-            score = state.scores[self.get_id()]
+        if current_state.step == current_state.max_step - 1:
+            # The draws are removed from the scores on the last step, only the next states give the final scores
+            possible_actions = current_state.generate_possible_heavy_actions()
+            best_action = next(possible_actions)
+            best_score = best_action.get_next_game_state().scores[self.get_id()]
+
+            for action in possible_actions:
+                state = action.get_next_game_state()
+                score = state.scores[self.get_id()]
+                if score > best_score:
+                    best_action, best_score = action, score
+
+            return best_action
+
+        # The points of every move are computed at once from the neighbours, without building the next states
+        scores = current_state.score_moves()
+        best_move = scores.moves[0]
+        best_score = scores.points[0]
+
+        for move, score in zip(scores.moves[1:], scores.points[1:]):
             if score > best_score:
-                best_action = action
-        
-        return best_action
+                best_move, best_score = move, score
+
+        return current_state.move_to_heavy_action(best_move)
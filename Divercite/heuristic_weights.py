@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import List
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json")
+
+
+@dataclass
+class HeuristicWeights:
+    """
+    Tunable constants of the alpha-beta heuristic (2000.py).
+
+    The defaults reproduce the hand-written values of the heuristic, so a player built
+    without a weights file behaves exactly as before.
+
+    Attributes:
+        divercite_threat (float): Value of a city that is (or can become) a divercite.
+        city_base (float): Base value of placing a city in the action heuristic.
+        balance_weight (float): Numerator of the color balance bonus.
+        balance_scale (float): Scale applied to the imbalance penalty of the balance bonus.
+        my_city_factor (float): Factor applied to the evaluation of our own cities.
+        opponent_city_factor (float): Factor applied to the opponent's evaluation of its cities.
+        opponent_factor (float): Factor applied to the opponent score in the state heuristic.
+    """
+
+    divercite_threat: float = 6
+    city_base: float = 1
+    balance_weight: float = 2
+    balance_scale: float = 0.5
+    my_city_factor: float = 1.0
+    opponent_city_factor: float = 0.5
+    opponent_factor: float = 0.8
+
+    # Weights only read by state_heuristic, the only ones a static position evaluation can fit
+    STATIC_FIELDS = ("divercite_threat", "my_city_factor", "opponent_city_factor", "opponent_factor")
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """
+        Return the names of the weights, in the order of the parameter vector.
+
+        Returns:
+            List[str]: The names of the weights.
+        """
+        return [f.name for f in fields(cls)]
+
+    def to_vector(self) -> List[float]:
+        """
+        Return the weights as a parameter vector.
+
+        Returns:
+            List[float]: The weights, ordered as `names()`.
+        """
+        return [getattr(self, name) for name in self.names()]
+
+    @classmethod
+    def from_vector(cls, vector: List[float]) -> HeuristicWeights:
+        """
+        Build weights from a parameter vector.
+
+        Args:
+            vector (List[float]): The weights, ordered as `names()`.
+
+        Returns:
+            HeuristicWeights: The corresponding weights.
+        """
+        return cls(**dict(zip(cls.names(), vector)))
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: str) -> HeuristicWeights:
+        return cls(**json.loads(data))
+
+    def save(self, path: str = DEFAULT_WEIGHTS_PATH) -> None:
+        """
+        Write the weights to a config file.
+
+        Args:
+            path (str, optional): Path of the config file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_WEIGHTS_PATH) -> HeuristicWeights:
+        """
+        Read the weights from a config file, falling back to the defaults if it does not exist.
+
+        Args:
+            path (str, optional): Path of the config file.
+
+        Returns:
+            HeuristicWeights: The loaded weights.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_json(f.read())
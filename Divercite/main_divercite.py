@@ -1,40 +1,23 @@
 import argparse
-import asyncio
 import os
 from os.path import basename, splitext, dirname
 import sys
 
-from board_divercite import BoardDivercite
-from player_divercite import PlayerDivercite
-from master_divercite import MasterDivercite
-from game_state_divercite import GameStateDivercite
-
-from seahorse.player.proxies import InteractivePlayerProxy, LocalPlayerProxy, RemotePlayerProxy
-from seahorse.utils.gui_client import GUIClient
-from seahorse.utils.recorders import StateRecorder
-from seahorse.game.game_layout.board import Piece
-from seahorse.utils.custom_exceptions import PlayerDuplicateError
-
-from loguru import logger
 from argparse import RawTextHelpFormatter
 
+# The modules of seahorse (the master and socketio above all) take most of the startup time,
+# they are imported by the modes that use them.
+
 def play(player1, player2, log_level, port, address, gui, record, gui_path) :
+    from master_divercite import MasterDivercite
+    from game_state_divercite import GameStateDivercite
+    from seahorse.utils.gui_client import GUIClient
+    from seahorse.utils.recorders import StateRecorder
+    from seahorse.utils.custom_exceptions import PlayerDuplicateError
 
     time_limit = 60*15
     list_players = [player1, player2]
-    init_scores = {player1.get_id(): 0, player2.get_id(): 0}
-    dim = [9, 9]
-    env = {}
-    n_resource_pieces_per_color = 3
-    n_city_pieces_per_color = 2
-    colors = ["R","G","B","Y"] # Red, Green, Blue, Yellow
-    city_resource_types = ["C","R"] # City, Resource
-    players_pieces_left = {player.get_id() : {c+t: (n_resource_pieces_per_color if t == "R" else n_city_pieces_per_color) 
-                            for c in colors for t in city_resource_types} for player in list_players}
-    
-    init_rep = BoardDivercite(env=env, dim=dim)
-    initial_game_state = GameStateDivercite(
-        scores=init_scores, next_player=player1, players=list_players, rep=init_rep, step=0, players_pieces_left=players_pieces_left)
+    initial_game_state = GameStateDivercite.initial_state(list_players)
     try:
         master = MasterDivercite(
             name="Divercite", initial_game_state=initial_game_state, players_iterator=list_players, log_level=log_level, port=port,
@@ -78,7 +61,9 @@ if __name__=="__main__":
     parser.add_argument("-p","--port",required=False,type=int, default=16001, help="The port of the machine that hosts the GameMaster.\n\n")
     parser.add_argument("-g","--no-gui",action='store_false',default=True, help="Headless mode\n\n")
     parser.add_argument("-r","--record",action="store_true",default=False, help="Stores the succesive game states in a json file.\n\n")
-    parser.add_argument("-l","--log",required=False,choices=["DEBUG","INFO"], default="DEBUG",help="\nSets the logging level.")
+    parser.add_argument("-l","--log",required=False,choices=["DEBUG","INFO","WARNING"], default="DEBUG",help="\nSets the logging level (WARNING does not print the board at each step).")
+    parser.add_argument("-d","--delta",action="store_true",default=False, help="host_game/connect: exchanges only the moves and state hashes with the remote player.\nBoth sides must use it.\n\n")
+    parser.add_argument("--async-search",action="store_true",default=False, help="host_game/connect: searches in a separate process, so the connection keeps answering during the search.\n\n")
     parser.add_argument("players_list",nargs="*", help='The players')
 
     args=parser.parse_args()
@@ -89,12 +74,18 @@ if __name__=="__main__":
     gui = vars(args).get("no_gui")
     record = vars(args).get("record")
     log_level = vars(args).get("log")
+    delta = vars(args).get("delta")
+    async_search = vars(args).get("async_search")
     list_players = vars(args).get("players_list")
 
     
 
     gui_path = os.path.join(dirname(os.path.abspath(__file__)),'GUI','index.html')
 
+    from game_state_divercite import GameStateDivercite
+    from player_divercite import PlayerDivercite
+    from loguru import logger
+
     if type == "local" :
         folder = dirname(list_players[0])
         sys.path.append(folder)
@@ -106,25 +97,39 @@ if __name__=="__main__":
         player2 = player2_class.MyPlayer("B", name=splitext(basename(list_players[1]))[0]+"_2")
         play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=gui, record=record, gui_path=gui_path)
     elif type == "host_game" :
+        from async_proxies import AsyncLocalPlayerProxy
+        from delta_proxies import DeltaRemotePlayerProxy
+        from seahorse.player.proxies import LocalPlayerProxy, RemotePlayerProxy
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player1_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
-        player1 = LocalPlayerProxy(player1_class.MyPlayer("W", name=splitext(basename(list_players[0]))[0]+"_local"),gs=GameStateDivercite)
-        player2 = RemotePlayerProxy(mimics=PlayerDivercite,piece_type="B",name="_remote")
+        local_proxy_class = AsyncLocalPlayerProxy if async_search else LocalPlayerProxy
+        player1 = local_proxy_class(player1_class.MyPlayer("W", name=splitext(basename(list_players[0]))[0]+"_local"),gs=GameStateDivercite)
+        remote_proxy_class = DeltaRemotePlayerProxy if delta else RemotePlayerProxy
+        player2 = remote_proxy_class(mimics=PlayerDivercite,piece_type="B",name="_remote")
         if address=='localhost':
             logger.warning('Using `localhost` with `host_game` mode, if both players are on different machines')
             logger.warning('use ipconfig/ifconfig to get your external ip and specity the ip with -a')
         play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=0, record=record, gui_path=gui_path)
     elif type == "connect" :
+        import asyncio
+        from async_proxies import AsyncDeltaLocalPlayerProxy, AsyncLocalPlayerProxy
+        from delta_proxies import DeltaLocalPlayerProxy
+        from seahorse.player.proxies import LocalPlayerProxy
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player2_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
-        player2 = LocalPlayerProxy(player2_class.MyPlayer("B", name="_remote"),gs=GameStateDivercite)
+        if async_search:
+            local_proxy_class = AsyncDeltaLocalPlayerProxy if delta else AsyncLocalPlayerProxy
+        else:
+            local_proxy_class = DeltaLocalPlayerProxy if delta else LocalPlayerProxy
+        player2 = local_proxy_class(player2_class.MyPlayer("B", name="_remote"),gs=GameStateDivercite)
         if address=='localhost':
             logger.warning('Using `localhost` with `connect` mode, if both players are on different machines')
             logger.warning('use ipconfig/ifconfig to get your external ip and specity the ip with -a')
         asyncio.new_event_loop().run_until_complete(player2.listen(keep_alive=True,master_address=f"http://{address}:{port}"))
     elif type == "human_vs_computer" :
+        from seahorse.player.proxies import InteractivePlayerProxy, LocalPlayerProxy
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player1_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
@@ -132,6 +137,7 @@ if __name__=="__main__":
         player2 = LocalPlayerProxy(player1_class.MyPlayer("B", name=splitext(basename(list_players[0]))[0]),gs=GameStateDivercite)
         play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=False, record=record, gui_path=gui_path)
     elif type == "human_vs_human" :
+        from seahorse.player.proxies import InteractivePlayerProxy
         player1 = InteractivePlayerProxy(PlayerDivercite("W", name="bob"),gui_path=gui_path,gs=GameStateDivercite)
         player2 = InteractivePlayerProxy(PlayerDivercite("B", name="alice"))
         player2.share_sid(player1)
@@ -1,5 +1,7 @@
 from typing import Dict, Iterable, List
 
+from board_divercite import BoardDivercite
+from loguru import logger
 from seahorse.game.game_state import GameState
 from seahorse.game.master import GameMaster
 from seahorse.player.player import Player
@@ -20,6 +22,8 @@ class MasterDivercite(GameMaster):
 
     def __init__(self, name: str, initial_game_state: GameState, players_iterator: Iterable[Player], log_level: str, port: int = 8080, hostname: str = "localhost", time_limit: int = 60*15) -> None:
         super().__init__(name, initial_game_state, players_iterator, log_level, port, hostname, time_limit)
+        # The board is only printed in INFO logs, skip its rendering when they are not emitted
+        BoardDivercite.RENDER = logger.level(log_level).no <= logger.level("INFO").no
         
     def compute_winner(self, scores: Dict[int, float]) -> List[Player]:
         """
@@ -0,0 +1,123 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board_divercite import BoardDivercite
+from game_state_divercite import N_COLUMNS, GameStateDivercite, cell_move_scores, decode_move
+from piece_divercite import COLORS, PieceDivercite
+
+NEIGHBOURS = BoardDivercite.NEIGHBOURS
+COLOR_INDEX = {color: k for k, color in enumerate(COLORS)}
+
+# Cells whose moves change in value when a piece is placed on a cell: its neighbours and their neighbours
+NEARBY_CELLS: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {
+    pos: tuple(sorted(({cell for neighbour in cells for cell in NEIGHBOURS[neighbour]} | set(cells)) - {pos}))
+    for pos, cells in NEIGHBOURS.items()
+}
+
+
+def env_piece_at(env: dict, placed: Optional[Tuple[Tuple[int, int], PieceDivercite]] = None) -> Callable[[int], Optional[PieceDivercite]]:
+    # The piece on a cell index of a board environment, with a placed piece added
+    if placed is None:
+        return lambda cell: env.get(divmod(cell, N_COLUMNS))
+    placed_cell = placed[0][0] * N_COLUMNS + placed[0][1]
+    return lambda cell: placed[1] if cell == placed_cell else env.get(divmod(cell, N_COLUMNS))
+
+
+def move_points(env: dict, piece: str, pos: Tuple[int, int], player_id: int,
+                placed: Optional[Tuple[Tuple[int, int], PieceDivercite]] = None) -> Tuple[int, int]:
+    """
+    Return the points won by the player playing a move and by its opponent, as compute_scores would give them
+    (without the draw removal of the last step), using only the neighbours of the cell (see cell_move_scores).
+
+    Args:
+        env (dict): The environment of the board.
+        piece (str): The type of the piece played (e.g. "RC").
+        pos (Tuple[int, int]): The position of the piece.
+        player_id (int): The ID of the player playing the move.
+        placed (Optional[Tuple[Tuple[int, int], PieceDivercite]], optional): A piece considered on the board in
+            addition to the environment, to evaluate the replies to a move without building its state.
+
+    Returns:
+        Tuple[int, int]: The points of the player and the points of its opponent.
+    """
+    scores = cell_move_scores(env_piece_at(env, placed), pos[0] * N_COLUMNS + pos[1], player_id)
+    points, opponent_points, _, _ = scores[COLOR_INDEX[piece[0]]]
+    return points, opponent_points
+
+
+def best_reply(env: dict, cells: List[Tuple[int, int]], pieces: List[str], player_id: int,
+               placed: Optional[Tuple[Tuple[int, int], PieceDivercite]] = None) -> int:
+    """
+    Return the best net points (own points minus opponent points) of a player among the moves on some cells.
+
+    Args:
+        env (dict): The environment of the board.
+        cells (List[Tuple[int, int]]): The empty cells considered.
+        pieces (List[str]): The types of the pieces the player has left.
+        player_id (int): The ID of the player.
+        placed (Optional[Tuple[Tuple[int, int], PieceDivercite]], optional): A piece considered on the board in
+            addition to the environment.
+
+    Returns:
+        int: The best net points, 0 if there is no move.
+    """
+    piece_at = env_piece_at(env, placed)
+    best = None
+    for cell in cells:
+        kind = BoardDivercite.BOARD_MASK[cell[0]][cell[1]]
+        colors = [COLOR_INDEX[piece[0]] for piece in pieces if piece[1] == kind]
+        if not colors:
+            continue
+        scores = cell_move_scores(piece_at, cell[0] * N_COLUMNS + cell[1], player_id)
+        net = max(scores[color][0] - scores[color][1] for color in colors)
+        if best is None or net > best:
+            best = net
+    return 0 if best is None else best
+
+
+def move_swing(state: GameStateDivercite, move: int, reply: bool = True) -> Tuple[int, int]:
+    """
+    Evaluate the point swing of a move without building its state.
+
+    The immediate swing is the points won by the player minus the points won by its opponent. The reply swing is
+    how much the move changes the best reply of the opponent, in net points for the opponent: positive when the
+    move opens threats (e.g. a third color around an opponent city), negative when it blocks some (e.g. a
+    duplicate color next to an opponent city with three colors). Only the replies near the move can change, so
+    only those are evaluated.
+
+    Args:
+        state (GameStateDivercite): The state.
+        move (int): The encoded move of the next player.
+        reply (bool, optional): Whether to evaluate the reply swing (0 otherwise).
+
+    Returns:
+        Tuple[int, int]: The immediate swing and the reply swing.
+    """
+    piece, pos = decode_move(move)
+    player = state.next_player
+    env = state.get_rep().get_env()
+    points, opponent_points = move_points(env, piece, pos, player.get_id())
+    if not reply:
+        return points - opponent_points, 0
+
+    opponent_id = next(player_id for player_id in state.players_pieces_left if player_id != player.get_id())
+    pieces = [p for p, n in state.players_pieces_left[opponent_id].items() if n > 0]
+    cells = [cell for cell in NEARBY_CELLS[pos] if cell not in env]
+    placed = (pos, PieceDivercite.get(piece + player.get_piece_type(), player.get_id()))
+    before = best_reply(env, cells + [pos], pieces, opponent_id)
+    after = best_reply(env, cells, pieces, opponent_id, placed)
+    return points - opponent_points, after - before
+
+
+def swing_score(state: GameStateDivercite, move: int) -> int:
+    """
+    Return the one-reply-ahead swing of a move: the immediate swing minus the reply swing.
+
+    Args:
+        state (GameStateDivercite): The state.
+        move (int): The encoded move of the next player.
+
+    Returns:
+        int: The score of the move, for move ordering or pruning.
+    """
+    immediate, reply = move_swing(state, move)
+    return immediate - reply
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, Tuple
+
+from seahorse.game.game_layout.board import Piece
+from seahorse.utils.serializer import Serializable
+
+from board_config import BOARD_CONFIG
+
+COLORS = BOARD_CONFIG.colors
+PIECE_TYPES = tuple(color + kind for color in COLORS for kind in ("C", "R"))
+PIECE_INDEX = {piece: i for i, piece in enumerate(PIECE_TYPES)}
+
+
+class PieceDivercite(Piece):
+    """
+    An immutable Divercite piece. Only one instance exists per (piece type, owner), use `PieceDivercite.get`.
+
+    The type string is decoded once, so the engine reads the color and the kind of a piece
+    without slicing `get_type()`.
+
+    Attributes:
+        piece_type (str): The type of the piece: color, kind and owner piece type (e.g. "RCW").
+        owner_id (int): The ID of the player owning the piece.
+        color (str): The color of the piece (e.g. "R", one of COLORS).
+        color_index (int): The index of the color in COLORS.
+        is_city (bool): True for a city, False for a resource.
+    """
+
+    _instances: Dict[Tuple[str, int], PieceDivercite] = {}
+
+    def __init__(self, piece_type: str, owner_id: int) -> None:
+        set_attr = object.__setattr__
+        set_attr(self, "piece_type", piece_type)
+        set_attr(self, "owner_id", owner_id)
+        set_attr(self, "color", piece_type[0])
+        set_attr(self, "color_index", COLORS.index(piece_type[0]))
+        set_attr(self, "is_city", piece_type[1] == "C")
+        set_attr(self, "_hash", hash((hash(piece_type), hash(owner_id))))
+
+    @classmethod
+    def get(cls, piece_type: str, owner_id: int) -> PieceDivercite:
+        """
+        Return the unique piece of the given type and owner.
+
+        Args:
+            piece_type (str): The type of the piece (e.g. "RCW").
+            owner_id (int): The ID of the player owning the piece.
+
+        Returns:
+            PieceDivercite: The interned piece.
+        """
+        key = (piece_type, owner_id)
+        piece = cls._instances.get(key)
+        if piece is None:
+            piece = cls._instances[key] = cls(piece_type, owner_id)
+        return piece
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("PieceDivercite is immutable")
+
+    def __reduce__(self):
+        return (PieceDivercite.get, (self.piece_type, self.owner_id))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or super().__eq__(other)
+
+    def copy(self, *, no_owner: bool = True) -> PieceDivercite:
+        return PieceDivercite.get(self.piece_type, -1 if no_owner else self.owner_id)
+
+    def to_json(self) -> dict:
+        return {"piece_type": self.piece_type, "owner_id": self.owner_id}
+
+    @classmethod
+    def from_json(cls, data) -> Serializable:
+        d = json.loads(data)
+        return cls.get(d["piece_type"], d.get("owner_id", -1))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, Tuple
+
+from piece_divercite import COLORS, PIECE_INDEX, PIECE_TYPES
+from seahorse.utils.serializer import Serializable
+
+
+class PiecesLeft(Mapping, Serializable):
+    """
+    The immutable inventory of a player: the number of pieces left of each type ("RC", "RR", ...).
+
+    Inventories are interned by their counts, so a child state shares the inventories of its parent and a
+    placement only looks up the inventory with one piece less. The color balance statistics are computed once
+    per distinct inventory.
+
+    Attributes:
+        counts (Tuple[int, ...]): The number of pieces left, ordered as PIECE_TYPES.
+        resource_imbalance (float): Sum of the deviations of the resources left of each color from their mean.
+        city_imbalance (float): Sum of the deviations of the cities left of each color from their mean.
+    """
+
+    __slots__ = ("counts", "resource_imbalance", "city_imbalance", "_decremented")
+
+    _instances: Dict[Tuple[int, ...], PiecesLeft] = {}
+
+    def __init__(self, counts: Tuple[int, ...]) -> None:
+        self.counts = counts
+        self.resource_imbalance = self._imbalance("R")
+        self.city_imbalance = self._imbalance("C")
+        self._decremented = {}
+
+    @classmethod
+    def get(cls, counts: Tuple[int, ...]) -> PiecesLeft:
+        """
+        Return the unique inventory with the given counts.
+
+        Args:
+            counts (Tuple[int, ...]): The number of pieces left, ordered as PIECE_TYPES.
+
+        Returns:
+            PiecesLeft: The interned inventory.
+        """
+        pieces_left = cls._instances.get(counts)
+        if pieces_left is None:
+            pieces_left = cls._instances[counts] = cls(counts)
+        return pieces_left
+
+    @classmethod
+    def from_dict(cls, pieces_left: Dict[str, int]) -> PiecesLeft:
+        """
+        Return the inventory corresponding to a dictionary of counts.
+
+        Args:
+            pieces_left (Dict[str, int]): The number of pieces left of each type.
+
+        Returns:
+            PiecesLeft: The interned inventory.
+        """
+        if isinstance(pieces_left, PiecesLeft):
+            return pieces_left
+        return cls.get(tuple(pieces_left[piece] for piece in PIECE_TYPES))
+
+    def _imbalance(self, kind: str) -> float:
+        counts = [self.counts[PIECE_INDEX[color + kind]] for color in COLORS]
+        avg_pieces = sum(counts) / len(counts)
+        return sum(abs(count - avg_pieces) for count in counts)
+
+    def decrement(self, piece: str) -> PiecesLeft:
+        """
+        Return the inventory left after playing a piece.
+
+        Args:
+            piece (str): The type of the piece played (e.g. "RC").
+
+        Returns:
+            PiecesLeft: The interned inventory with one piece less.
+        """
+        pieces_left = self._decremented.get(piece)
+        if pieces_left is None:
+            counts = list(self.counts)
+            counts[PIECE_INDEX[piece]] -= 1
+            pieces_left = self._decremented[piece] = PiecesLeft.get(tuple(counts))
+        return pieces_left
+
+    def __getitem__(self, piece: str) -> int:
+        return self.counts[PIECE_INDEX[piece]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PIECE_TYPES)
+
+    def __len__(self) -> int:
+        return len(PIECE_TYPES)
+
+    def __hash__(self) -> int:
+        return hash(self.counts)
+
+    def __reduce__(self):
+        return (PiecesLeft.get, (self.counts,))
+
+    def __repr__(self) -> str:
+        return f"PiecesLeft({dict(self)})"
+
+    def to_json(self) -> dict:
+        return dict(zip(PIECE_TYPES, self.counts))
@@ -0,0 +1,317 @@
+import argparse
+import json
+import mmap
+import os
+import random
+import sys
+from argparse import RawTextHelpFormatter
+from array import array
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Tuple
+
+from board_config import BOARD_CONFIG, BoardConfig
+from board_divercite import BoardDivercite
+from game_state_divercite import N_CELLS, N_COLUMNS, GameStateDivercite, encode_move
+from piece_divercite import PIECE_INDEX, PIECE_TYPES, PieceDivercite
+from player_divercite import PlayerDivercite
+from self_play import load_player_class, play_game
+
+# Each column is a .npy file (loadable with numpy.load(path, mmap_mode="r")) whose header is rewritten on close
+HEADER_SIZE = 128
+
+# The cells, the pieces left and the step are 16 bits: with a larger board config (board_config.py), games can
+# last more than 127 steps
+COLUMNS = (
+    ("cells", "h", N_CELLS),  # 0 if empty, else 1 + piece index + number of piece types * owner (0 for the first player)
+    ("pieces_left", "h", 2 * len(PIECE_TYPES)),  # pieces left of the first player, then of the second
+    ("scores", "h", 2),
+    ("side_to_move", "b", 1),
+    ("step", "h", 1),
+    ("outcome", "f", 1),  # final result of the first player: 1, 0.5 or 0
+    ("best_move", "h", 1),  # move played from the position (encode_move), -1 at the end of the game
+    ("game", "i", 1),
+)
+
+
+def _npy_header(typecode: str, rows: int, width: int) -> bytes:
+    itemsize = array(typecode).itemsize
+    descr = ("<" if sys.byteorder == "little" else ">") + ("f" if typecode == "f" else "i") + str(itemsize)
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d, %d), }" % (descr, rows, width)
+    return b"\x93NUMPY\x01\x00" + (HEADER_SIZE - 10).to_bytes(2, "little") + header.ljust(HEADER_SIZE - 11).encode() + b"\n"
+
+
+def encode_position(state: GameStateDivercite, player_ids: List[int], outcome: float, best_move: int, game: int) -> Dict[str, list]:
+    """
+    Encode a position as one row of the dataset.
+
+    Args:
+        state (GameStateDivercite): The position.
+        player_ids (List[int]): The IDs of the first and of the second player.
+        outcome (float): The final result of the first player.
+        best_move (int): The encoded move played from the position, -1 if none.
+        game (int): The index of the game.
+
+    Returns:
+        Dict[str, list]: The values of each column.
+    """
+    owner = {player_id: k for k, player_id in enumerate(player_ids)}
+    cells = [0] * N_CELLS
+    for (i, j), piece in state.get_rep().get_env().items():
+        cells[i * N_COLUMNS + j] = 1 + PIECE_INDEX[piece.piece_type[:2]] + len(PIECE_TYPES) * owner[piece.owner_id]
+    return {
+        "cells": cells,
+        "pieces_left": [n for player_id in player_ids for n in state.players_pieces_left[player_id].counts],
+        "scores": [int(state.scores[player_id]) for player_id in player_ids],
+        "side_to_move": [state.step % 2],
+        "step": [state.step],
+        "outcome": [outcome],
+        "best_move": [best_move],
+        "game": [game],
+    }
+
+
+def encode_game(states: List[GameStateDivercite], player_ids: List[int], game: int) -> List[Dict[str, list]]:
+    """
+    Encode every position of a game, with the move played from it and the final result.
+
+    Args:
+        states (List[GameStateDivercite]): The successive states of the game.
+        player_ids (List[int]): The IDs of the first and of the second player.
+        game (int): The index of the game.
+
+    Returns:
+        List[Dict[str, list]]: The rows of the game.
+    """
+    final_scores = states[-1].scores
+    first, second = final_scores[player_ids[0]], final_scores[player_ids[1]]
+    outcome = 0.5 if first == second else float(first > second)
+    rows = []
+    for state, next_state in zip(states, states[1:] + [None]):
+        best_move = -1
+        if next_state is not None:
+            env = state.get_rep().get_env()
+            for pos, piece in next_state.get_rep().get_env().items():
+                if pos not in env:
+                    best_move = encode_move(piece.piece_type[:2], pos)
+        rows.append(encode_position(state, player_ids, outcome, best_move, game))
+    return rows
+
+
+class PositionDatasetWriter:
+    """
+    Writes positions to a columnar dataset directory, one .npy file per column, in chunks.
+
+    Attributes:
+        directory (str): The dataset directory.
+        chunk_size (int): The number of rows buffered before writing them.
+        rows (int): The number of rows written.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 1 << 16) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._pending = 0
+        self._files = {}
+        self._buffers = {}
+        for name, typecode, _ in COLUMNS:
+            self._files[name] = open(os.path.join(directory, name + ".npy"), "wb")
+            self._files[name].write(b"\0" * HEADER_SIZE)
+            self._buffers[name] = array(typecode)
+
+    def append(self, row: Dict[str, list]) -> None:
+        """
+        Add a row given by `encode_position`.
+
+        Args:
+            row (Dict[str, list]): The values of each column.
+        """
+        for name, values in row.items():
+            self._buffers[name].extend(values)
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, buffer in self._buffers.items():
+            buffer.tofile(self._files[name])
+            del buffer[:]
+        self._pending = 0
+
+    def close(self) -> None:
+        """
+        Write the pending rows, the final .npy headers and the metadata of the dataset.
+        """
+        self.flush()
+        for name, typecode, width in COLUMNS:
+            self._files[name].seek(0)
+            self._files[name].write(_npy_header(typecode, self.rows, width))
+            self._files[name].close()
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump({"rows": self.rows, "columns": COLUMNS, "board_config": BOARD_CONFIG.to_json()}, f)
+
+    def __enter__(self) -> "PositionDatasetWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class PositionDataset:
+    """
+    Read-only access to a dataset written by PositionDatasetWriter. The columns are memory mapped,
+    so only the rows accessed are loaded.
+
+    Attributes:
+        directory (str): The dataset directory.
+        rows (int): The number of rows.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        # datasets written before the board config was recorded are of the standard game
+        config = BoardConfig(**meta.get("board_config", {}))
+        if config != BOARD_CONFIG:
+            raise ValueError(f"The dataset {directory} was written with the board config {config}, not {BOARD_CONFIG}")
+        self.rows = meta["rows"]
+        self._maps = []
+        self._columns = {}
+        for name, typecode, width in meta["columns"]:
+            with open(os.path.join(directory, name + ".npy"), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            self._columns[name] = (memoryview(mapped)[HEADER_SIZE:].cast(typecode), width)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> memoryview:
+        """
+        Return a column as a flat memory view of rows * width values.
+
+        Args:
+            name (str): The name of the column.
+
+        Returns:
+            memoryview: The values of the column.
+        """
+        return self._columns[name][0]
+
+    def row(self, i: int) -> Dict[str, list]:
+        """
+        Return the values of each column for a row.
+
+        Args:
+            i (int): The index of the row.
+
+        Returns:
+            Dict[str, list]: The values of each column.
+        """
+        return {name: values[i * width:(i + 1) * width].tolist() for name, (values, width) in self._columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, list]]:
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def to_state(self, i: int) -> GameStateDivercite:
+        """
+        Rebuild the game state of a row. The first player has ID 0 and the second player ID 1.
+
+        Args:
+            i (int): The index of the row.
+
+        Returns:
+            GameStateDivercite: The game state.
+        """
+        row = self.row(i)
+        players = [PlayerDivercite("W", name="player_1", id=0), PlayerDivercite("B", name="player_2", id=1)]
+        env = {}
+        for cell, code in enumerate(row["cells"]):
+            if code:
+                owner, piece_index = divmod(code - 1, len(PIECE_TYPES))
+                env[divmod(cell, N_COLUMNS)] = PieceDivercite.get(PIECE_TYPES[piece_index] + players[owner].piece_type, owner)
+        n = len(PIECE_TYPES)
+        return GameStateDivercite(
+            scores={0: row["scores"][0], 1: row["scores"][1]},
+            next_player=players[row["side_to_move"][0]],
+            players=players,
+            rep=BoardDivercite(env=env, dim=[len(BoardDivercite.BOARD_MASK), N_COLUMNS]),
+            step=row["step"][0],
+            players_pieces_left={k: dict(zip(PIECE_TYPES, row["pieces_left"][k * n:(k + 1) * n])) for k in range(2)},
+        )
+
+    def close(self) -> None:
+        for values, _ in self._columns.values():
+            values.release()
+        for mapped in self._maps:
+            mapped.close()
+
+
+def recorded_games(paths: List[str]) -> Iterator[Tuple[List[GameStateDivercite], List[int]]]:
+    """
+    Read games recorded with `-r` (StateRecorder json files), one game at a time.
+
+    Args:
+        paths (List[str]): The recorded games.
+
+    Yields:
+        Tuple[List[GameStateDivercite], List[int]]: The states of a game and the IDs of its players.
+    """
+    for path in paths:
+        with open(path) as f:
+            steps = json.load(f)
+        player_ids = [int(p["id"]) if isinstance(p, dict) else int(p) for p in steps[0]["players"]]
+        yield [GameStateDivercite.from_json(json.dumps(step)) for step in steps], player_ids
+
+
+def self_play_game(job: Tuple[str, str, int, int, float]) -> List[Dict[str, list]]:
+    """
+    Play a self-play game and encode its positions.
+
+    Args:
+        job (Tuple[str, str, int, int, float]): The two player modules, the index of the game, its seed and the
+            time limit of each player.
+
+    Returns:
+        List[Dict[str, list]]: The rows of the game.
+    """
+    player1_path, player2_path, game, seed, time_limit = job
+    random.seed(seed)
+    player1 = load_player_class(player1_path)("W", name="player_1")
+    player2 = load_player_class(player2_path)("B", name="player_2")
+    history = []
+    play_game(player1, player2, time_limit=time_limit, history=history)
+    return encode_game(history, [player1.get_id(), player2.get_id()], game)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="position_dataset.py",
+                        description="Writes the positions of recorded or self-play games to a columnar dataset.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("output", help="The dataset directory.\n\n")
+    parser.add_argument("--records", nargs="*", default=[], help="Games recorded with -r (json).\n\n")
+    parser.add_argument("--self-play", type=int, default=0, help="The number of self-play games to play.\n\n")
+    parser.add_argument("--players", nargs=2, default=["2000.py", "2000.py"], help="The self-play players.\n\n")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="The number of games played in parallel.\n\n")
+    parser.add_argument("--time-limit", type=float, default=60, help="Time credit of each player in self-play games (s).\n\n")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the self-play games.")
+    args = parser.parse_args()
+
+    with PositionDatasetWriter(args.output) as writer:
+        n_games = 0
+        for states, player_ids in recorded_games(args.records):
+            for row in encode_game(states, player_ids, n_games):
+                writer.append(row)
+            n_games += 1
+        if args.self_play:
+            jobs = [(args.players[0], args.players[1], n_games + k, args.seed + k, args.time_limit) for k in range(args.self_play)]
+            with Pool(args.processes) as pool:
+                for rows in pool.imap_unordered(self_play_game, jobs):
+                    for row in rows:
+                        writer.append(row)
+        print(f"{writer.rows} positions written to {args.output}")
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from argparse import RawTextHelpFormatter
+from dataclasses import asdict, dataclass
+from typing import List, Tuple
+
+DEFAULT_PROBCUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probcut.json")
+
+
+@dataclass
+class ProbCut:
+    """
+    ProbCut parameters of the alpha-beta search (2000.py). The value of a search of depth `deep_depth` is
+    predicted from the value of a search of depth `shallow_depth` of the same state by the linear regression
+    `slope * shallow + intercept`, with residuals of standard deviation `sigma`. A move is not searched deeply
+    when its shallow value predicts a deep value outside the window by more than `threshold` standard deviations.
+
+    Attributes:
+        shallow_depth (int): Depth of the shallow search.
+        deep_depth (int): Depth of the deep search, the depth difference is kept for deeper searches.
+        slope (float): Slope of the regression.
+        intercept (float): Intercept of the regression.
+        sigma (float): Standard deviation of the residuals of the regression.
+        threshold (float): Number of standard deviations the prediction must fall outside the window by, no
+            move is skipped with an infinite threshold.
+        positions (int): Number of positions the regression was fitted on.
+    """
+
+    shallow_depth: int = 1
+    deep_depth: int = 3
+    slope: float = 1.0
+    intercept: float = 0.0
+    sigma: float = 1.0
+    threshold: float = 1.5
+    positions: int = 0
+
+    def shallow_depth_for(self, depth: int) -> int:
+        """
+        Return the depth of the shallow search predicting a search of a given depth.
+
+        Args:
+            depth (int): The depth of the deep search, at least `deep_depth`.
+
+        Returns:
+            int: The depth of the shallow search.
+        """
+        return depth - (self.deep_depth - self.shallow_depth)
+
+    def low_bound(self, alpha: float) -> float:
+        """
+        Return the shallow value under which the deep value is predicted under alpha.
+
+        Args:
+            alpha (float): The lower bound of the window.
+
+        Returns:
+            float: The shallow value bound.
+        """
+        return (alpha - self.threshold * self.sigma - self.intercept) / self.slope
+
+    def high_bound(self, beta: float) -> float:
+        """
+        Return the shallow value over which the deep value is predicted over beta.
+
+        Args:
+            beta (float): The upper bound of the window.
+
+        Returns:
+            float: The shallow value bound.
+        """
+        return (beta + self.threshold * self.sigma - self.intercept) / self.slope
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: str) -> ProbCut:
+        return cls(**json.loads(data))
+
+    def save(self, path: str = DEFAULT_PROBCUT_PATH) -> None:
+        """
+        Write the parameters to a config file.
+
+        Args:
+            path (str, optional): Path of the config file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PROBCUT_PATH) -> ProbCut:
+        """
+        Read the parameters from a config file, falling back to the defaults if it does not exist.
+
+        Args:
+            path (str, optional): Path of the config file.
+
+        Returns:
+            ProbCut: The loaded parameters.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_json(f.read())
+
+
+def linear_regression(pairs: List[Tuple[float, float]]) -> Tuple[float, float, float]:
+    """
+    Fit y = slope * x + intercept by least squares.
+
+    Args:
+        pairs (List[Tuple[float, float]]): The (x, y) samples.
+
+    Returns:
+        Tuple[float, float, float]: The slope, the intercept and the standard deviation of the residuals.
+    """
+    n = len(pairs)
+    mean_x = sum(x for x, _ in pairs) / n
+    mean_y = sum(y for _, y in pairs) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in pairs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in pairs) / var_x if var_x > 0 else 1.0
+    intercept = mean_y - slope * mean_x
+    sigma = math.sqrt(sum((y - slope * x - intercept) ** 2 for x, y in pairs) / max(n - 2, 1))
+    return slope, intercept, sigma
+
+
+def fit(player_path: str, paths: List[str], n_positions: int, shallow_depth: int, deep_depth: int,
+        threshold: float, seed: int = 0) -> ProbCut:
+    """
+    Fit the ProbCut regression on positions of recorded games or position datasets: each position is
+    searched at both depths by a player of `player_path` in ProbCut mode, without any cut, from the side
+    of a random player.
+
+    Args:
+        player_path (str): The player module accepting a `probcut` argument.
+        paths (List[str]): The recorded games (json) and position datasets.
+        n_positions (int): The number of positions sampled.
+        shallow_depth (int): Depth of the shallow search.
+        deep_depth (int): Depth of the deep search.
+        threshold (float): The threshold written with the fitted parameters.
+        seed (int, optional): Seed of the sampling.
+
+    Returns:
+        ProbCut: The fitted parameters.
+    """
+    from self_play import load_player_class
+    from tune_weights import load_positions
+
+    rng = random.Random(seed)
+    positions = [p for p in load_positions(paths) if not p[0].is_done() and p[0].step > 0]
+    positions = rng.sample(positions, min(n_positions, len(positions)))
+    evaluator = load_player_class(player_path)("W", name="probcut", probcut=ProbCut(threshold=math.inf))
+    pairs = []
+    start = time.time()
+    for k, (state, first_id, second_id, _) in enumerate(positions):
+        if state.next_player is None:
+            # states of recorded games do not keep the next player, the players alternate
+            state.next_player = state.players[state.step % 2]
+        evaluator.id, evaluator.opponent_id = (first_id, second_id) if rng.random() < 0.5 else (second_id, first_id)
+        search = evaluator.max_value if state.next_player.get_id() == evaluator.id else evaluator.min_value
+        _, (shallow, _) = search(state, -math.inf, math.inf, shallow_depth)
+        _, (deep, _) = search(state, -math.inf, math.inf, deep_depth)
+        pairs.append((shallow, deep))
+        if (k + 1) % 20 == 0:
+            print(f"{k+1}/{len(positions)} positions searched ({time.time() - start:.0f} s)")
+    slope, intercept, sigma = linear_regression(pairs)
+    return ProbCut(shallow_depth, deep_depth, slope, intercept, sigma, threshold, len(pairs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="probcut.py",
+                        description="Fits the ProbCut regression between shallow and deep search values of 2000.py and writes\n"
+                                    "it to the config file loaded by the player in ProbCut mode.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("games", nargs="+", help="The recorded games (json) or position datasets.\n\n")
+    parser.add_argument("--player", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "2000.py"),
+                        help="The player module.\n\n")
+    parser.add_argument("-n", "--positions", type=int, default=300, help="The number of positions sampled.\n\n")
+    parser.add_argument("--shallow", type=int, default=1, help="Depth of the shallow search.\n\n")
+    parser.add_argument("--deep", type=int, default=3, help="Depth of the deep search.\n\n")
+    parser.add_argument("-t", "--threshold", type=float, default=1.5, help="Cut threshold, in standard deviations.\n\n")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sampling.\n\n")
+    parser.add_argument("-o", "--output", default=DEFAULT_PROBCUT_PATH, help="Where to write the parameters.")
+    args = parser.parse_args()
+
+    probcut = fit(args.player, args.games, args.positions, args.shallow, args.deep, args.threshold, args.seed)
+    probcut.save(args.output)
+    print(f"Slope {probcut.slope:.4f}, intercept {probcut.intercept:.4f}, sigma {probcut.sigma:.4f} "
+          f"on {probcut.positions} positions, written to {args.output}")
@@ -0,0 +1,98 @@
+import argparse
+import json
+from argparse import RawTextHelpFormatter
+from typing import List
+
+from game_state_divercite import GameStateDivercite
+from position_dataset import recorded_games
+
+# A replay is a json lines file, read by the GUI (Load JSON):
+#   {"game": k, "players": [...], "checkpoint_interval": n, <snapshot>}   start of a game, snapshot of step 0
+#   {"move": "RCW", "position": [i, j], "owner_id": id, "scores": {...}, "next_player": name}   one line per step
+#   {"checkpoint": step, <snapshot>}   every checkpoint_interval steps, after the move reaching the step
+# where a snapshot is {"env": {...}, "scores": {...}, "pieces_left": {...}, "next_player": name}.
+
+
+def snapshot(state: GameStateDivercite) -> dict:
+    """
+    Return the full description of a state needed by the GUI.
+
+    Args:
+        state (GameStateDivercite): The state.
+
+    Returns:
+        dict: The board, the scores, the pieces left and the name of the next player.
+    """
+    return {
+        "env": {str(pos): piece.to_json() for pos, piece in state.get_rep().get_env().items()},
+        "scores": state.scores,
+        "pieces_left": {player_id: dict(pieces_left) for player_id, pieces_left in state.players_pieces_left.items()},
+        "next_player": next_player_name(state),
+    }
+
+
+def next_player_name(state: GameStateDivercite) -> str:
+    # States read back from json have no next player, the players play in turn
+    return state.players[state.step % len(state.players)].get_name()
+
+
+class ReplayWriter:
+    """
+    Writes games as compact replays: the initial state, then only the move and the scores of each step,
+    with a full snapshot every `checkpoint_interval` steps to seek quickly.
+
+    Attributes:
+        path (str): The replay file.
+        checkpoint_interval (int): The number of steps between two snapshots.
+        games (int): The number of games written.
+    """
+
+    def __init__(self, path: str, checkpoint_interval: int = 10) -> None:
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.games = 0
+        self._file = open(path, "w")
+
+    def write_game(self, states: List[GameStateDivercite]) -> None:
+        """
+        Add a game to the replay.
+
+        Args:
+            states (List[GameStateDivercite]): The successive states of the game.
+        """
+        players = [{"name": p.get_name(), "id": p.get_id(), "piece_type": p.get_piece_type()} for p in states[0].players]
+        lines = [{"game": self.games, "players": players, "checkpoint_interval": self.checkpoint_interval, **snapshot(states[0])}]
+        for state, next_state in zip(states, states[1:]):
+            env = state.get_rep().get_env()
+            pos, piece = next((pos, piece) for pos, piece in next_state.get_rep().get_env().items() if pos not in env)
+            lines.append({"move": piece.piece_type, "position": list(pos), "owner_id": piece.owner_id,
+                          "scores": next_state.scores, "next_player": next_player_name(next_state)})
+            if next_state.step % self.checkpoint_interval == 0:
+                lines.append({"checkpoint": next_state.step, **snapshot(next_state)})
+        self._file.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        self.games += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="replay_log.py",
+                        description="Converts games recorded with -r to a compact replay, loadable by the GUI.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("output", help="The replay file (.jsonl).\n\n")
+    parser.add_argument("records", nargs="+", help="Games recorded with -r (json).\n\n")
+    parser.add_argument("-c", "--checkpoint-interval", type=int, default=10, help="The number of steps between two snapshots.")
+    args = parser.parse_args()
+
+    with ReplayWriter(args.output, args.checkpoint_interval) as writer:
+        for states, _ in recorded_games(args.records):
+            writer.write_game(states)
+    print(f"{writer.games} games written to {args.output}")
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import RawTextHelpFormatter
+from typing import Dict, List
+
+from board_config import BOARD_CONFIG_ENV, BoardConfig
+
+
+def run_search(player_path: str, positions: int, opening_moves: int, max_depth: int, seed: int) -> Dict[str, object]:
+    """
+    Search random positions of the board config of the process at increasing depths with a player.
+
+    Args:
+        player_path (str): The player module (e.g. 2000.py), with `alpha_beta_search` and `get_nodes`.
+        positions (int): The number of positions searched.
+        opening_moves (int): The number of random moves played to reach each position.
+        max_depth (int): The deepest search, every depth from 1 is searched.
+        seed (int): Seed of the positions.
+
+    Returns:
+        Dict[str, object]: The nodes and the time of each depth summed over the positions, the time to build the
+            player (its tables) and the peak memory of the process (MB).
+    """
+    from game_state_divercite import GameStateDivercite
+    from player_divercite import PlayerDivercite
+    from self_play import load_player_class
+    from sprt import random_opening
+
+    start = time.time()
+    player = load_player_class(player_path)("W", name="player")
+    opponent = PlayerDivercite("B", name="opponent")
+    init_time = time.time() - start
+
+    rng = random.Random(seed)
+    nodes, times = [0] * max_depth, [0.] * max_depth
+    for _ in range(positions):
+        state = GameStateDivercite.initial_state([player, opponent])
+        # an even number of moves, so the player is to move
+        for move in random_opening(player, opponent, opening_moves - opening_moves % 2, rng.getrandbits(32)):
+            state = state.apply_move(move)
+        player.opponent_id = opponent.get_id()
+        for depth in range(1, max_depth + 1):
+            player._nodes = 0
+            start = time.time()
+            if getattr(player, "evaluation", None) == "table":
+                player._city_tables.accumulate(state)
+            player.alpha_beta_search(state, depth)
+            times[depth - 1] += time.time() - start
+            nodes[depth - 1] += player.get_nodes()
+    return {"init": init_time, "nodes": nodes, "times": times,
+            "memory": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def launch(config: BoardConfig, player_path: str, positions: int, opening_moves: int, max_depth: int,
+           seed: int) -> Dict[str, object]:
+    """
+    Launch a process searching positions of a board config, with an empty table cache.
+
+    Args:
+        config (BoardConfig): The board config.
+        player_path (str): The player module.
+        positions (int): The number of positions searched.
+        opening_moves (int): The number of random moves played to reach each position.
+        max_depth (int): The deepest search.
+        seed (int): Seed of the positions.
+
+    Returns:
+        Dict[str, object]: The results of run_search.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = os.path.join(tmp_dir, "board.json")
+        config.save(config_path)
+        env = {**os.environ, BOARD_CONFIG_ENV: config_path, "DIVERCITE_TABLES_DIR": os.path.join(tmp_dir, "tables")}
+        process = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-search", player_path,
+                                  str(positions), str(opening_moves), str(max_depth), str(seed)],
+                                 env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"The search on {config} failed:\n{process.stderr}")
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="scaling_benchmark.py",
+                        description="Measures how the search scales with the board: nodes/s, time to each depth and peak\n"
+                                    "memory of a player on random positions of boards of several radii and colors.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("--player", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "2000.py"),
+                        help="The player module.\n\n")
+    parser.add_argument("-r", "--radius", type=int, nargs="+", default=[4, 5, 6], help="The radii of the boards.\n\n")
+    parser.add_argument("-c", "--colors", nargs="+", default=["RGBY"], help="The colors of the boards, e.g. RGBY RGBYOP.\n\n")
+    parser.add_argument("--resources", type=int, default=3, help="The number of resources of each color of each player.\n\n")
+    parser.add_argument("--cities", type=int, default=2, help="The number of cities of each color of each player.\n\n")
+    parser.add_argument("-n", "--positions", type=int, default=5, help="The number of positions searched per board.\n\n")
+    parser.add_argument("--opening-moves", type=int, default=10, help="The number of random moves before each position.\n\n")
+    parser.add_argument("-d", "--depth", type=int, default=3, help="The deepest search.\n\n")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the positions.\n\n")
+    parser.add_argument("--run-search", nargs=5, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_search:
+        player_path, positions, opening_moves, max_depth, seed = args.run_search
+        print(json.dumps(run_search(player_path, int(positions), int(opening_moves), int(max_depth), int(seed))))
+        sys.exit(0)
+
+    for colors in args.colors:
+        for radius in args.radius:
+            try:
+                config = BoardConfig(radius, tuple(colors), args.resources, args.cities)
+            except ValueError as e:
+                print(f"Radius {radius}, colors {colors} skipped: {e}")
+                continue
+            result = launch(config, args.player, args.positions, args.opening_moves, args.depth, args.seed)
+            nodes: List[int] = result["nodes"]
+            times: List[float] = result["times"]
+            depths = ", ".join(f"d{depth} {t / args.positions * 1000:.0f}ms" for depth, t in enumerate(times, 1))
+            print(f"Radius {radius}, colors {colors}, {config.max_step} steps: {sum(nodes) / sum(times):,.0f} nodes/s, "
+                  f"time to depth {depths}, init {result['init'] * 1000:.0f}ms, peak memory {result['memory']:.0f}MB")
@@ -0,0 +1,77 @@
+import sys
+import time
+from os.path import basename, dirname, splitext
+from typing import List
+
+from game_state_divercite import GameStateDivercite
+from player_divercite import PlayerDivercite
+
+
+def load_player_class(path: str) -> type:
+    """
+    Import the `MyPlayer` class of a player module, the same way main_divercite.py does.
+
+    Args:
+        path (str): Path of the player module (e.g. "2000.py").
+
+    Returns:
+        type: The `MyPlayer` class of the module.
+    """
+    folder = dirname(path)
+    if folder not in sys.path:
+        sys.path.append(folder)
+    return __import__(splitext(basename(path))[0], fromlist=[None]).MyPlayer
+
+
+def play_game(player1: PlayerDivercite, player2: PlayerDivercite, time_limit: float = 60*15,
+              history: List[GameStateDivercite] = None, opening: List[int] = None) -> GameStateDivercite:
+    """
+    Play a whole game between two players, without the master, the GUI or any socket.
+
+    The remaining time of each player is tracked and given to `compute_action` like the master does,
+    but a player running out of time is not disqualified.
+
+    Args:
+        player1 (PlayerDivercite): The player playing first.
+        player2 (PlayerDivercite): The player playing second.
+        time_limit (float, optional): Time credit of each player in (s).
+        history (List[GameStateDivercite], optional): If given, every state of the game is appended to it.
+        opening (List[int], optional): Encoded moves played before the players start.
+
+    Returns:
+        GameStateDivercite: The final state of the game.
+    """
+    state = GameStateDivercite.initial_state([player1, player2])
+    for move in opening or []:
+        state = state.apply_move(move)
+    remaining_time = {player1.get_id(): time_limit, player2.get_id(): time_limit}
+    if history is not None:
+        history.append(state)
+    while not state.is_done():
+        player = state.get_next_player()
+        start = time.time()
+        action = player.compute_action(current_state=state, remaining_time=remaining_time[player.get_id()])
+        remaining_time[player.get_id()] -= time.time() - start
+        state = action.get_heavy_action(state).get_next_game_state()
+        if history is not None:
+            history.append(state)
+    return state
+
+
+def game_points(state: GameStateDivercite, player: PlayerDivercite) -> float:
+    """
+    Return the points of a player for a finished game: 1 for a win, 0.5 for a draw and 0 for a loss.
+
+    Args:
+        state (GameStateDivercite): The final state of the game.
+        player (PlayerDivercite): The player.
+
+    Returns:
+        float: The points of the player.
+    """
+    scores = state.get_scores()
+    best = max(scores.values())
+    winners: List[int] = [pid for pid, score in scores.items() if score == best]
+    if player.get_id() not in winners:
+        return 0.
+    return 1. / len(winners)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import struct
+import time
+from argparse import RawTextHelpFormatter
+from multiprocessing import Pool, shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+from tt_snapshot import Entry, NO_MOVE
+
+# A shared table is a header followed by buckets of BUCKET_SIZE slots of 32 bytes, in a shared memory block:
+#   header: magic, format version, number of buckets (a power of 2)
+#   slot: check (8 bytes) then data (24 bytes): scores of the players in playing order, depth, flag, best move,
+#         value and heuristic of the leaf, as in tt_snapshot.py
+# There is no lock: the check is the key xored with the three 8 bytes words of the data, so a slot written by
+# two processes at once (torn write) does not match its key and is ignored. A key of 0 marks an empty slot.
+MAGIC = b"DIVERSTT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQ")
+DATA = struct.Struct("<hhbbHdd")
+SLOT_SIZE = 8 + DATA.size
+BUCKET_SIZE = 4
+MASK_64 = (1 << 64) - 1
+
+Key = Tuple[int, Tuple[int, int]]
+
+
+def fold(data: bytes) -> int:
+    # Xor of the 8 bytes words of the data
+    words = int.from_bytes(data, "little")
+    return (words ^ (words >> 64) ^ (words >> 128)) & MASK_64
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in shared memory, used like the dict of the search of 2000.py (keys are a key and the
+    scores of the players, entries are (depth, flag, value, leaf heuristic, best move)) by several processes:
+    parallel searches or concurrent self-play games. When a bucket is full, the entry searched the least deep
+    is replaced.
+
+    Attributes:
+        name (str): The name of the shared memory block, to attach the table in other processes.
+        buckets (int): The number of buckets.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool) -> None:
+        magic, version, buckets = HEADER.unpack_from(memory.buf)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            memory.close()
+            raise ValueError(f"The shared memory block {memory.name} is not a transposition table of this version")
+        self.name = memory.name
+        self.buckets = buckets
+        self._memory = memory
+        self._buf = memory.buf
+        self._mask = buckets - 1
+        self._owner = owner
+
+    @classmethod
+    def create(cls, entries: int, name: Optional[str] = None) -> SharedTranspositionTable:
+        """
+        Create a table. The process creating it must unlink it when the other processes are done.
+
+        Args:
+            entries (int): The minimum number of entries, rounded up to a power of 2 buckets.
+            name (Optional[str], optional): The name of the shared memory block (default is a random name).
+
+        Returns:
+            SharedTranspositionTable: The table.
+        """
+        buckets = 1
+        while buckets * BUCKET_SIZE < entries:
+            buckets *= 2
+        memory = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + buckets * BUCKET_SIZE * SLOT_SIZE)
+        memory.buf[:HEADER.size + buckets * BUCKET_SIZE * SLOT_SIZE] = bytes(HEADER.size + buckets * BUCKET_SIZE * SLOT_SIZE)
+        HEADER.pack_into(memory.buf, 0, MAGIC, FORMAT_VERSION, buckets)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> SharedTranspositionTable:
+        """
+        Attach a table created by another process.
+
+        Args:
+            name (str): The name of the shared memory block.
+
+        Returns:
+            SharedTranspositionTable: The table.
+        """
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    def _slot(self, offset: int) -> Optional[Tuple[int, bytes]]:
+        # The key and the data of a slot, None if it is empty or torn
+        slot = bytes(self._buf[offset:offset + SLOT_SIZE])
+        data = slot[8:]
+        key = int.from_bytes(slot[:8], "little") ^ fold(data)
+        if key == 0:
+            return None
+        return key, data
+
+    def get(self, key: Key) -> Optional[Entry]:
+        """
+        Return the entry of a key.
+
+        Args:
+            key (Key): The key of the state and the scores of the players in playing order.
+
+        Returns:
+            Optional[Entry]: The entry, None if it is not in the table.
+        """
+        state_key, scores = key
+        offset = HEADER.size + (state_key & self._mask) * BUCKET_SIZE * SLOT_SIZE
+        for k in range(BUCKET_SIZE):
+            slot = self._slot(offset + k * SLOT_SIZE)
+            if slot is not None and slot[0] == state_key:
+                score_1, score_2, depth, flag, best_move, value, he = DATA.unpack(slot[1])
+                if (score_1, score_2) == scores:
+                    return depth, flag, value, he, None if best_move == NO_MOVE else best_move
+        return None
+
+    def __setitem__(self, key: Key, entry: Entry) -> None:
+        state_key, (score_1, score_2) = key
+        depth, flag, value, he, best_move = entry
+        data = DATA.pack(score_1, score_2, depth, flag, NO_MOVE if best_move is None else best_move, value, he)
+        offset = HEADER.size + (state_key & self._mask) * BUCKET_SIZE * SLOT_SIZE
+        target, target_depth = offset, None
+        for k in range(BUCKET_SIZE):
+            slot_offset = offset + k * SLOT_SIZE
+            slot = self._slot(slot_offset)
+            if slot is None:
+                target = slot_offset
+                break
+            if slot[0] == state_key and slot[1][:4] == data[:4]:
+                target = slot_offset
+                break
+            slot_depth = slot[1][4] if slot[1][4] < 128 else slot[1][4] - 256
+            if target_depth is None or slot_depth < target_depth:
+                target, target_depth = slot_offset, slot_depth
+        self._buf[target:target + SLOT_SIZE] = ((state_key ^ fold(data)).to_bytes(8, "little")) + data
+
+    def items(self) -> Iterator[Tuple[Key, Entry]]:
+        """
+        Iterate over the entries of the table.
+
+        Returns:
+            Iterator[Tuple[Key, Entry]]: The keys and the entries.
+        """
+        for offset in range(HEADER.size, HEADER.size + self.buckets * BUCKET_SIZE * SLOT_SIZE, SLOT_SIZE):
+            slot = self._slot(offset)
+            if slot is not None:
+                score_1, score_2, depth, flag, best_move, value, he = DATA.unpack(slot[1])
+                yield (slot[0], (score_1, score_2)), (depth, flag, value, he, None if best_move == NO_MOVE else best_move)
+
+    def close(self) -> None:
+        """
+        Detach the table, and free it if this process created it.
+        """
+        self._buf = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+def expected_entry(state_key: int) -> Entry:
+    # The entry stored for a key by the check, so any entry read can be verified
+    return state_key % 100, state_key % 3, float(state_key % 1000003), float(state_key % 997), state_key % 648
+
+
+def check_torn_write(table: SharedTranspositionTable) -> bool:
+    """
+    Write the first half of a slot over the slot of another entry of the same key, as a write interrupted by
+    another process would, and check that the table does not return the mixed entry.
+
+    Args:
+        table (SharedTranspositionTable): An empty table.
+
+    Returns:
+        bool: Whether the torn slot is ignored.
+    """
+    state_key, scores = 12345, (1, 2)
+    table[state_key, scores] = (4, 0, 1.5, 2.0, 7)
+    offset = HEADER.size + (state_key & table._mask) * BUCKET_SIZE * SLOT_SIZE
+    slot = bytes(table._buf[offset:offset + SLOT_SIZE])
+    table[state_key, scores] = (5, 1, 3.5, 4.0, 8)
+    table._buf[offset:offset + SLOT_SIZE // 2] = slot[:SLOT_SIZE // 2]
+    torn_ignored = table.get((state_key, scores)) is None
+    table._buf[offset:offset + SLOT_SIZE] = bytes(SLOT_SIZE)
+    return torn_ignored
+
+
+def hammer(job: Tuple[str, int, int]) -> Tuple[int, int, int, float]:
+    """
+    Store and probe random keys of a small key space shared by every process in a shared table, so that
+    processes write the same slots at the same time.
+
+    Args:
+        job (Tuple[str, int, int]): The name of the table, the seed and the number of operations.
+
+    Returns:
+        Tuple[int, int, int, float]: The number of probes, of hits, of wrong entries read and the time spent.
+    """
+    name, seed, operations = job
+    table = SharedTranspositionTable.attach(name)
+    keys = [random.Random(k).getrandbits(64) | 1 for k in range(1 << 12)]
+    rng = random.Random(seed)
+    probes = hits = wrong = 0
+    start = time.perf_counter()
+    for _ in range(operations):
+        state_key = keys[rng.randrange(len(keys))]
+        scores = (state_key % 37, state_key % 41)
+        if rng.random() < 0.5:
+            table[state_key, scores] = expected_entry(state_key)
+        else:
+            probes += 1
+            entry = table.get((state_key, scores))
+            if entry is not None:
+                hits += 1
+                wrong += entry != expected_entry(state_key)
+    elapsed = time.perf_counter() - start
+    table.close()
+    return probes, hits, wrong, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="shared_tt.py",
+                        description="Checks that concurrent processes never read a wrong entry from a shared transposition\n"
+                                    "table (torn writes are detected by the key check), and measures the probe/store throughput.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-e", "--entries", type=int, default=1 << 10, help="The size of the table, small to force collisions.\n\n")
+    parser.add_argument("-n", "--operations", type=int, default=200000, help="The number of operations per process.\n\n")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="The number of processes.\n\n")
+    args = parser.parse_args()
+
+    table = SharedTranspositionTable.create(args.entries)
+    try:
+        if not check_torn_write(table):
+            print("A torn slot was returned")
+            raise SystemExit(1)
+        jobs: List[Tuple[str, int, int]] = [(table.name, seed, args.operations) for seed in range(args.processes)]
+        with Pool(args.processes) as pool:
+            for processes in sorted({1, args.processes}):
+                results = pool.map(hammer, jobs[:processes])
+                probes, hits, wrong = (sum(result[k] for result in results) for k in range(3))
+                elapsed = max(result[3] for result in results)
+                print(f"{processes} process(es): {processes * args.operations / elapsed:,.0f} operations/s, "
+                      f"{hits}/{probes} hits, {wrong} wrong entries")
+                if wrong:
+                    raise SystemExit(1)
+    finally:
+        table.close()
@@ -0,0 +1,246 @@
+import argparse
+import inspect
+import math
+import os
+import random
+import time
+from argparse import RawTextHelpFormatter
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from game_state_divercite import GameStateDivercite
+from player_divercite import PlayerDivercite
+from self_play import game_points, load_player_class, play_game
+
+# Quantile of the normal distribution of the 95% confidence intervals
+Z_95 = 1.959964
+
+# Scores of a pair (0, 0.5, 1, 1.5 or 2 points out of 2), and pseudo-count of each added to the pairs played for
+# the variance, so that it is not 0 or tiny when the first pairs all have the same score (e.g. A won all of them)
+PAIR_SCORES = (0., 0.25, 0.5, 0.75, 1.)
+PAIR_PRIOR = 0.25
+
+
+def random_opening(player1: PlayerDivercite, player2: PlayerDivercite, n_moves: int, seed: int) -> List[int]:
+    """
+    Draw the random opening moves of a game pair.
+
+    Args:
+        player1 (PlayerDivercite): The player playing first.
+        player2 (PlayerDivercite): The player playing second.
+        n_moves (int): The number of moves.
+        seed (int): The seed of the pair.
+
+    Returns:
+        List[int]: The encoded moves, the same for both games of the pair since the first player is always white.
+    """
+    rng = random.Random(seed)
+    state = GameStateDivercite.initial_state([player1, player2])
+    opening = []
+    for _ in range(n_moves):
+        move = rng.choice(state.get_possible_moves())
+        opening.append(move)
+        state = state.apply_move(move)
+    return opening
+
+
+def budget_kwargs(player_class: type, node_budget: Optional[int]) -> dict:
+    """
+    Return the keyword arguments giving a node budget to a player class, if it accepts one.
+
+    Args:
+        player_class (type): The player class.
+        node_budget (Optional[int]): Nodes searched per move, None to keep the default search.
+
+    Returns:
+        dict: The `node_budget` argument, empty for players without one (e.g. the greedy player).
+    """
+    if node_budget is None or "node_budget" not in inspect.signature(player_class).parameters:
+        return {}
+    return {"node_budget": node_budget}
+
+
+def play_pair(job: Tuple[str, str, int, int, float, Optional[int]]) -> Tuple[float, float]:
+    """
+    Play two games between two player modules from the same random opening, swapping colors.
+
+    Args:
+        job (Tuple[str, str, int, int, float, Optional[int]]): Module of A, module of B, seed, number of opening
+            moves, time limit of each player and node budget per move of the players accepting one (None to keep the
+            default search).
+
+    Returns:
+        Tuple[float, float]: Points of A over the two games (between 0 and 2) and CPU time used (s).
+    """
+    path_a, path_b, seed, opening_moves, time_limit, node_budget = job
+    start = time.process_time()
+    class_a, class_b = load_player_class(path_a), load_player_class(path_b)
+    budget_a, budget_b = (budget_kwargs(player_class, node_budget) for player_class in (class_a, class_b))
+    points = 0.
+    opening = None
+    for a_first in (True, False):
+        random.seed(seed)
+        player_a = class_a("W" if a_first else "B", "sprt_a", **budget_a)
+        player_b = class_b("B" if a_first else "W", "sprt_b", **budget_b)
+        players = (player_a, player_b) if a_first else (player_b, player_a)
+        if opening is None:
+            opening = random_opening(*players, opening_moves, seed)
+        state = play_game(*players, time_limit=time_limit, opening=opening)
+        points += game_points(state, player_a)
+    return points, time.process_time() - start
+
+
+def expected_score(elo: float) -> float:
+    """
+    Return the expected score of a player with an Elo difference over its opponent.
+
+    Args:
+        elo (float): The Elo difference.
+
+    Returns:
+        float: The expected score, between 0 and 1.
+    """
+    return 1. / (1. + 10 ** (-elo / 400))
+
+
+def score_elo(score: float) -> float:
+    """
+    Return the Elo difference of an expected score.
+
+    Args:
+        score (float): The expected score, clamped inside ]0, 1[.
+
+    Returns:
+        float: The Elo difference.
+    """
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def pair_stats(pair_scores: List[float]) -> Tuple[float, float]:
+    """
+    Return the mean of the pair scores, and their variance with PAIR_PRIOR pairs of each score added.
+
+    Args:
+        pair_scores (List[float]): The score of A in each pair, between 0 and 1.
+
+    Returns:
+        Tuple[float, float]: The mean and the variance.
+    """
+    counts = [pair_scores.count(score) + PAIR_PRIOR for score in PAIR_SCORES]
+    n = sum(counts)
+    prior_mean = sum(count * score for count, score in zip(counts, PAIR_SCORES)) / n
+    variance = sum(count * (score - prior_mean) ** 2 for count, score in zip(counts, PAIR_SCORES)) / n
+    return sum(pair_scores) / len(pair_scores), variance
+
+
+def log_likelihood_ratio(pair_scores: List[float], elo0: float, elo1: float) -> float:
+    """
+    Return the log-likelihood ratio of H1 (A is `elo1` stronger than B) against H0 (A is `elo0` stronger).
+
+    Pairs are the samples (pentanomial model): the two games of a pair share their opening and are not
+    independent. The ratio uses the normal approximation of the generalized SPRT.
+
+    Args:
+        pair_scores (List[float]): The score of A in each pair, between 0 and 1.
+        elo0 (float): The Elo difference of H0.
+        elo1 (float): The Elo difference of H1.
+
+    Returns:
+        float: The log-likelihood ratio.
+    """
+    mean, variance = pair_stats(pair_scores)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return len(pair_scores) * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+
+def elo_interval(pair_scores: List[float]) -> Tuple[float, float, float]:
+    """
+    Estimate the Elo difference of A over B with its 95% confidence interval.
+
+    Args:
+        pair_scores (List[float]): The score of A in each pair, between 0 and 1.
+
+    Returns:
+        Tuple[float, float, float]: The Elo difference, and the bounds of the interval.
+    """
+    mean, variance = pair_stats(pair_scores)
+    margin = Z_95 * math.sqrt(variance / len(pair_scores))
+    return score_elo(mean), score_elo(mean - margin), score_elo(mean + margin)
+
+
+def sprt(path_a: str, path_b: str, elo0: float, elo1: float, alpha: float, beta: float, max_pairs: int,
+         processes: int, opening_moves: int, time_limit: float, node_budget: Optional[int] = None,
+         seed: int = 0) -> Tuple[Optional[str], List[float], float]:
+    """
+    Play game pairs between two player modules in parallel until the SPRT accepts H0 or H1.
+
+    Args:
+        path_a (str): The module of the tested player.
+        path_b (str): The module of the reference player.
+        elo0 (float): The Elo difference of A over B under H0.
+        elo1 (float): The Elo difference of A over B under H1.
+        alpha (float): The probability of accepting H1 when H0 holds.
+        beta (float): The probability of accepting H0 when H1 holds.
+        max_pairs (int): The number of pairs after which the test stops without a result.
+        processes (int): The number of pairs played in parallel.
+        opening_moves (int): The number of random moves of the openings.
+        time_limit (float): Time credit of each player in (s).
+        node_budget (Optional[int], optional): Nodes searched per move, for games that do not depend on the machine.
+        seed (int, optional): Seed of the openings.
+
+    Returns:
+        Tuple[Optional[str], List[float], float]: The accepted hypothesis ("H0", "H1" or None), the score of A in
+            each pair and the CPU time used by the games (s).
+    """
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    rng = random.Random(seed)
+    jobs = [(path_a, path_b, rng.getrandbits(32), opening_moves, time_limit, node_budget) for _ in range(max_pairs)]
+    pair_scores: List[float] = []
+    cpu_time = 0.
+    result = None
+    with Pool(processes) as pool:
+        for points, pair_cpu_time in pool.imap_unordered(play_pair, jobs):
+            pair_scores.append(points / 2)
+            cpu_time += pair_cpu_time
+            llr = log_likelihood_ratio(pair_scores, elo0, elo1)
+            print(f"Pair {len(pair_scores)}: {points}/2, score {sum(pair_scores)}/{len(pair_scores)}, "
+                  f"LLR {llr:.3f} [{lower:.3f}, {upper:.3f}]")
+            if llr <= lower or llr >= upper:
+                # the pairs in progress are discarded when the pool is terminated
+                result = "H1" if llr >= upper else "H0"
+                break
+    return result, pair_scores, cpu_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="sprt.py",
+                        description="Sequential probability ratio test between two player modules: pairs of games (same random\n"
+                                    "opening, colors swapped) are played in parallel until H0 (A is elo0 stronger than B) or\n"
+                                    "H1 (A is elo1 stronger) is accepted.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("player_a", help="The tested player module.\n\n")
+    parser.add_argument("player_b", help="The reference player module.\n\n")
+    parser.add_argument("--elo0", type=float, default=0, help="Elo difference of H0.\n\n")
+    parser.add_argument("--elo1", type=float, default=20, help="Elo difference of H1.\n\n")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Probability of accepting H1 when H0 holds.\n\n")
+    parser.add_argument("--beta", type=float, default=0.05, help="Probability of accepting H0 when H1 holds.\n\n")
+    parser.add_argument("-n", "--max-pairs", type=int, default=1000, help="The maximum number of game pairs.\n\n")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="The number of pairs played in parallel.\n\n")
+    parser.add_argument("--opening-moves", type=int, default=4, help="The number of random opening moves.\n\n")
+    parser.add_argument("--time-limit", type=float, default=60, help="Time credit of each player (s).\n\n")
+    parser.add_argument("--nodes", type=int, default=None, help="Node budget per move, for players accepting a `node_budget` argument.\n\n")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the openings.")
+    args = parser.parse_args()
+
+    wall_start = time.time()
+    cpu_start = time.process_time()
+    result, pair_scores, cpu_time = sprt(args.player_a, args.player_b, args.elo0, args.elo1, args.alpha, args.beta,
+                                         args.max_pairs, args.processes, args.opening_moves, args.time_limit,
+                                         args.nodes, args.seed)
+    cpu_time += time.process_time() - cpu_start
+    elo, elo_low, elo_high = elo_interval(pair_scores)
+    print(f"{'No hypothesis accepted' if result is None else result + ' accepted'} after {len(pair_scores)} pairs")
+    print(f"Elo of A over B: {elo:.1f} (95% interval [{elo_low:.1f}, {elo_high:.1f}])")
+    print(f"CPU time {cpu_time:.1f} s, wall time {time.time() - wall_start:.1f} s")
@@ -0,0 +1,87 @@
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import RawTextHelpFormatter
+from os.path import basename, dirname, splitext
+from typing import Dict, List
+
+
+def run_player(player_path: str, launch_time: float) -> Dict[str, float]:
+    """
+    Import a player, build it and compute its first action, in a new process launched at `launch_time`.
+
+    Args:
+        player_path (str): The player module (e.g. 2000.py).
+        launch_time (float): The time the process was launched (time.time() of the parent).
+
+    Returns:
+        Dict[str, float]: The time from the launch to the end of each stage, in seconds.
+    """
+    times = {"interpreter": time.time() - launch_time}
+    sys.path.append(dirname(os.path.abspath(player_path)))
+    module = importlib.import_module(splitext(basename(player_path))[0])
+    from game_state_divercite import GameStateDivercite
+    from player_divercite import PlayerDivercite
+    times["import"] = time.time() - launch_time
+
+    player = module.MyPlayer("W", name="player")
+    state = GameStateDivercite.initial_state([player, PlayerDivercite("B", name="opponent")])
+    times["init"] = time.time() - launch_time
+
+    player.compute_action(current_state=state, remaining_time=900)
+    times["first_action"] = time.time() - launch_time
+    return times
+
+
+def launch(player_path: str, tables_dir: str) -> Dict[str, float]:
+    """
+    Launch a process computing the first action of a player.
+
+    Args:
+        player_path (str): The player module.
+        tables_dir (str): The directory of the table cache used by the process.
+
+    Returns:
+        Dict[str, float]: The times of run_player.
+    """
+    env = {**os.environ, "DIVERCITE_TABLES_DIR": tables_dir}
+    launch_time = time.time()
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-player", player_path, str(launch_time)],
+                             env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"The player {player_path} failed:\n{process.stderr}")
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="startup_benchmark.py",
+                        description="Measures the time from the launch of a process to the first action of a player,\n"
+                                    "with an empty table cache (cold) and with the tables of a previous run (warm).",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("players", nargs="*", default=["2000.py"], help="The players (default is 2000.py).\n\n")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="The number of runs of each kind.\n\n")
+    parser.add_argument("--run-player", nargs=2, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_player:
+        print(json.dumps(run_player(args.run_player[0], float(args.run_player[1]))))
+        sys.exit(0)
+
+    for player_path in args.players:
+        runs: Dict[str, List[Dict[str, float]]] = {"cold": [], "warm": []}
+        with tempfile.TemporaryDirectory() as warm_dir:
+            launch(player_path, warm_dir)
+            for _ in range(args.runs):
+                with tempfile.TemporaryDirectory() as cold_dir:
+                    runs["cold"].append(launch(player_path, cold_dir))
+                runs["warm"].append(launch(player_path, warm_dir))
+        for kind, times in runs.items():
+            stages = ", ".join(f"{stage} {statistics.median(t[stage] for t in times) * 1000:.1f}ms" for stage in times[0])
+            print(f"{player_path} ({kind}, median of {args.runs}): {stages}")
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any, Callable, Hashable, Iterable
+
+# Precomputed tables are kept in one pickle file per kind of table, holding the version of the sources that built
+# them and the tables of the last keys used (e.g. the last heuristic weights). A file whose version differs from
+# the current sources is rebuilt. The directory can be changed with the DIVERCITE_TABLES_DIR environment variable.
+TABLES_DIR = os.environ.get("DIVERCITE_TABLES_DIR",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "tables"))
+# Number of keys kept per file, the tuning of the weights would otherwise fill it with every weights tried
+MAX_KEYS = 16
+
+
+def source_version(sources: Iterable[str]) -> str:
+    """
+    Return the version of tables built from some source files: a digest of their content and of the Python version.
+
+    Args:
+        sources (Iterable[str]): The source files.
+
+    Returns:
+        str: The version.
+    """
+    digest = hashlib.sha1(sys.version.encode())
+    for path in sorted(set(sources)):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_tables(name: str, sources: Iterable[str], key: Hashable, build: Callable[[], Any]) -> Any:
+    """
+    Return the tables of a key, read from their file if they were built by the current sources, else built and
+    saved. A file that cannot be read or written only costs a build.
+
+    Args:
+        name (str): The kind of tables, which is the name of their file.
+        sources (Iterable[str]): The source files whose content the tables depend on.
+        key (Hashable): The key of the tables in the file (e.g. the weights they are built with).
+        build (Callable[[], Any]): Builds the tables, they must be picklable.
+
+    Returns:
+        Any: The tables.
+    """
+    path = os.path.join(TABLES_DIR, name + ".pickle")
+    version = source_version(sources)
+    tables = {}
+    try:
+        with open(path, "rb") as f:
+            file_version, tables = pickle.load(f)
+        if file_version != version:
+            tables = {}
+    except Exception:
+        tables = {}
+    if key in tables:
+        return tables[key]
+
+    value = tables[key] = build()
+    for old_key in list(tables)[:-MAX_KEYS]:
+        del tables[old_key]
+    try:
+        os.makedirs(TABLES_DIR, exist_ok=True)
+        # Written to a temporary file then renamed, so concurrent workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=TABLES_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((version, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return value
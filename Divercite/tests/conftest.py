@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules of the game are imported by name from the Divercite directory, as main_divercite.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+from async_proxies import AsyncDeltaLocalPlayerProxy, AsyncLocalPlayerProxy, SearchCancelledError
+from game_state_divercite import GameStateDivercite
+from player_divercite import PlayerDivercite
+
+
+class SlowPlayer(PlayerDivercite):
+    # A player whose search only ends when its process is stopped
+
+    def compute_action(self, current_state, **kwargs):
+        time.sleep(60)
+
+
+@pytest.mark.parametrize("proxy_class", [AsyncLocalPlayerProxy, AsyncDeltaLocalPlayerProxy])
+def test_cancelled_search_raises_instead_of_returning_none(proxy_class):
+    async def run():
+        proxy = proxy_class(SlowPlayer("W", name="slow"))
+        sent = []
+
+        async def emit(*args, **kwargs):
+            sent.append(args)
+
+        proxy.sio.emit = emit
+        state = GameStateDivercite.initial_state([proxy.wrapped_player, PlayerDivercite("B", name="opponent")])
+        play = asyncio.ensure_future(proxy.play(state, remaining_time=900))
+        await asyncio.sleep(1)
+        proxy.search_worker.cancel()
+        with pytest.raises(SearchCancelledError):
+            await play
+        assert sent == []
+
+    asyncio.run(asyncio.wait_for(run(), 30))
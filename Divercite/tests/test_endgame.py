@@ -0,0 +1,77 @@
+import os
+import random
+import sys
+
+from game_state_divercite import GameStateDivercite
+from player_divercite import PlayerDivercite
+from self_play import load_player_class, play_game
+
+PLAYER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "2000.py")
+MyPlayer = load_player_class(PLAYER_PATH)
+ENDGAME_STEPS = sys.modules[MyPlayer.__module__].ENDGAME_STEPS
+ENDGAME_LOW_TIME_NODES = sys.modules[MyPlayer.__module__].ENDGAME_LOW_TIME_NODES
+ENDGAME_NODE_LIMIT = sys.modules[MyPlayer.__module__].ENDGAME_NODE_LIMIT
+
+
+def endgame_state(player: PlayerDivercite, seed: int) -> GameStateDivercite:
+    # A random game stopped when the endgame solver starts, with the player to move
+    rng = random.Random(seed)
+    state = GameStateDivercite.initial_state([player, PlayerDivercite("B", name="opponent")])
+    while state.max_step - state.step > ENDGAME_STEPS:
+        state = state.apply_move(rng.choice(state.get_possible_moves()))
+    return state
+
+
+def test_endgame_solver_stays_in_the_node_budget():
+    node_budget = 3000
+    for seed in range(6):
+        player = MyPlayer("W", name="budget", node_budget=node_budget)
+        completed_depths = []
+        search = player.alpha_beta_search
+
+        def alpha_beta_search(state, depth):
+            action = search(state, depth)
+            completed_depths.append(depth)
+            return action
+
+        player.alpha_beta_search = alpha_beta_search
+        state = endgame_state(player, seed)
+        action = player.compute_action(current_state=state)
+        assert action.get_next_game_state().step == state.step + 1
+        # the nodes of the solver and of the search share the budget (the search stops one node over it)
+        assert player.get_nodes() <= node_budget + 1
+        # a move not found by the solver is found by a search, not taken from the move ordering
+        assert completed_depths or player.get_nodes() <= node_budget // 2
+
+
+def test_endgame_solver_is_limited_by_the_remaining_time():
+    for remaining_time in (1e9, 50, 5):
+        player = MyPlayer("W", name="time")
+        node_limits = []
+        solve = player.solve_endgame
+
+        def solve_endgame(state, node_limit):
+            node_limits.append(node_limit)
+            return solve(state, node_limit)
+
+        player.solve_endgame = solve_endgame
+        state = endgame_state(player, 0)
+        player.compute_action(current_state=state, remaining_time=remaining_time)
+        assert node_limits == [min(ENDGAME_NODE_LIMIT, int(remaining_time * ENDGAME_LOW_TIME_NODES))]
+
+
+def test_both_players_save_their_tt_snapshot(tmp_path):
+    saved = []
+    players = [MyPlayer(piece_type, name=f"tt_{piece_type}", node_budget=2000, tt_snapshot_dir=str(tmp_path))
+               for piece_type in "WB"]
+    for player in players:
+        save = player.save_tt_snapshot
+
+        def save_tt_snapshot(player=player, save=save):
+            saved.append(player.get_id())
+            save()
+
+        player.save_tt_snapshot = save_tt_snapshot
+    random.seed(0)
+    play_game(*players)
+    assert sorted(set(saved)) == sorted(player.get_id() for player in players)
@@ -0,0 +1,16 @@
+import random
+
+from game_state_divercite import GameStateDivercite
+from greedy_player_divercite import MyPlayer
+
+
+def test_greedy_player_plays_a_best_scoring_move():
+    for seed in range(5):
+        rng = random.Random(seed)
+        state = GameStateDivercite.initial_state([MyPlayer("W", name="a"), MyPlayer("B", name="b")])
+        while not state.is_done():
+            player = state.next_player
+            best = max(state.apply_move(move).scores[player.get_id()] for move in state.get_possible_moves())
+            action = player.compute_action(current_state=state)
+            assert action.get_heavy_action(state).get_next_game_state().scores[player.get_id()] == best
+            state = state.apply_move(rng.choice(state.get_possible_moves()))
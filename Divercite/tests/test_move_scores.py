@@ -0,0 +1,24 @@
+import random
+
+from game_state_divercite import GameStateDivercite, decode_move
+from move_swing import move_points
+from player_divercite import PlayerDivercite
+
+
+def test_score_moves_and_move_points_match_compute_scores():
+    # score_moves and move_points share cell_move_scores, compute_scores (the rules of the game) is the reference
+    for seed in range(10):
+        rng = random.Random(seed)
+        state = GameStateDivercite.initial_state([PlayerDivercite("W", name="a"), PlayerDivercite("B", name="b")])
+        while state.step < state.max_step - 1:
+            player_id = state.next_player.get_id()
+            opponent_id = next(pid for pid in state.scores if pid != player_id)
+            scores = state.score_moves()
+            env = state.get_rep().get_env()
+            for move, points, opponent_points in zip(scores.moves, scores.points, scores.opponent_points):
+                piece, pos = decode_move(move)
+                next_scores = state.compute_scores((pos, piece, player_id))
+                expected = (next_scores[player_id] - state.scores[player_id], next_scores[opponent_id] - state.scores[opponent_id])
+                assert (points, opponent_points) == expected
+                assert move_points(env, piece, pos, player_id) == expected
+            state = state.apply_move(rng.choice(state.get_possible_moves()))
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+from board_config import BOARD_CONFIG_ENV, BoardConfig
+
+DIVERCITE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a process started with the board config, since the config is read at import
+ROUND_TRIP = """
+import random
+import sys
+
+from game_state_divercite import GameStateDivercite
+from player_divercite import PlayerDivercite
+from position_dataset import PositionDataset, PositionDatasetWriter, encode_game, encode_position
+
+players = [PlayerDivercite("W", name="player_1"), PlayerDivercite("B", name="player_2")]
+rng = random.Random(0)
+states = [GameStateDivercite.initial_state(players)]
+while not states[-1].is_done():
+    states.append(states[-1].apply_move(rng.choice(states[-1].get_possible_moves())))
+rows = encode_game(states, [player.get_id() for player in players], 0)
+with PositionDatasetWriter(sys.argv[1]) as writer:
+    for row in rows:
+        writer.append(row)
+dataset = PositionDataset(sys.argv[1])
+assert len(dataset) == len(rows) == states[-1].max_step + 1
+for i, row in enumerate(rows):
+    assert dataset.row(i) == row, i
+    assert encode_position(dataset.to_state(i), [0, 1], row["outcome"][0], row["best_move"][0], 0) == row, i
+dataset.close()
+"""
+
+
+def test_round_trip_of_a_game_longer_than_127_steps(tmp_path):
+    config = BoardConfig(radius=9, colors=("R", "G", "B", "Y", "O", "P"), n_resource_pieces=7, n_city_pieces=4)
+    assert config.max_step > 127
+    config_path = str(tmp_path / "board.json")
+    config.save(config_path)
+    process = subprocess.run([sys.executable, "-c", ROUND_TRIP, str(tmp_path / "dataset")], cwd=DIVERCITE_DIR,
+                             env={**os.environ, BOARD_CONFIG_ENV: config_path}, capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+
+    # the standard game does not read a dataset of another board
+    process = subprocess.run([sys.executable, "-c", "from position_dataset import PositionDataset; import sys; PositionDataset(sys.argv[1])",
+                              str(tmp_path / "dataset")], cwd=DIVERCITE_DIR, env={**os.environ, BOARD_CONFIG_ENV: ""},
+                             capture_output=True, text=True)
+    assert "ValueError" in process.stderr
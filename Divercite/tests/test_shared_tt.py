@@ -0,0 +1,35 @@
+from multiprocessing import Pool
+
+from shared_tt import BUCKET_SIZE, DATA, HEADER, SLOT_SIZE, SharedTranspositionTable, check_torn_write, hammer
+
+
+def test_concurrent_processes_never_read_a_wrong_entry():
+    # 64 entries for 4096 keys: the processes keep replacing the entries of each other in the same slots
+    table = SharedTranspositionTable.create(64)
+    try:
+        with Pool(4) as pool:
+            results = pool.map(hammer, [(table.name, seed, 20000) for seed in range(4)])
+        hits = sum(result[1] for result in results)
+        wrong = sum(result[2] for result in results)
+        assert hits > 0
+        assert wrong == 0
+    finally:
+        table.close()
+
+
+def test_torn_slot_is_ignored():
+    table = SharedTranspositionTable.create(64)
+    try:
+        assert check_torn_write(table)
+
+        # new data written over a slot without its check, as a write interrupted before the check
+        state_key, scores = 6789, (3, 4)
+        table[state_key, scores] = (4, 0, 1.5, 2.0, 7)
+        assert table.get((state_key, scores)) == (4, 0, 1.5, 2.0, 7)
+        offset = HEADER.size + (state_key & (table.buckets - 1)) * BUCKET_SIZE * SLOT_SIZE
+        table._buf[offset + 8:offset + SLOT_SIZE] = DATA.pack(3, 4, 5, 1, 8, 3.5, 4.0)
+        assert table.get((state_key, scores)) is None
+        # the slot now decodes to another (random) key, which no probe of its bucket can match
+        assert all(key[0] != state_key for key, _ in table.items())
+    finally:
+        table.close()
@@ -0,0 +1,29 @@
+import os
+import random
+
+from game_state_divercite import GameStateDivercite
+from move_swing import swing_score
+from player_divercite import PlayerDivercite
+from self_play import load_player_class
+
+MyPlayer = load_player_class(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "2000.py"))
+
+
+def test_root_moves_of_equal_heuristic_are_ordered_by_swing():
+    player, opponent = MyPlayer("W", name="swing"), PlayerDivercite("B", name="opponent")
+    player.opponent_id = opponent.get_id()
+    changed = 0
+    for seed in range(10):
+        rng = random.Random(seed)
+        state = GameStateDivercite.initial_state([player, opponent])
+        for _ in range(2 * rng.randrange(1, 12)):
+            state = state.apply_move(rng.choice(state.get_possible_moves()))
+        player._root = None
+        without_swing = [move for move, _ in player.filter_actions(state)]
+        player._root = state
+        actions = player.filter_actions(state)
+        keys = [(heuristic, swing_score(state, move)) for move, heuristic in actions]
+        assert keys == sorted(keys, reverse=True)
+        changed += [move for move, _ in actions] != without_swing
+    # the swing changes the order (and often the moves kept in the best third) of most roots
+    assert changed > 0
@@ -0,0 +1,30 @@
+import random
+
+from game_state_divercite import GameStateDivercite
+from heuristic_weights import HeuristicWeights
+from player_divercite import PlayerDivercite
+from position_dataset import PositionDatasetWriter, encode_game
+from tune_weights import DEFAULT_PLAYER, load_positions, sigmoid, texel
+
+
+def test_sigmoid_does_not_overflow():
+    assert sigmoid(0) == 0.5
+    assert sigmoid(1000) == 1.
+    assert sigmoid(-1000) == 0.
+    assert abs(sigmoid(-2) + sigmoid(2) - 1) < 1e-12
+
+
+def test_texel_on_random_games(tmp_path):
+    players = [PlayerDivercite("W", name="player_1"), PlayerDivercite("B", name="player_2")]
+    # the game of seed 16 reaches a heuristic of -12.2 for the first player: exp(12.2 * K) overflows for the
+    # largest scales tried by texel
+    with PositionDatasetWriter(str(tmp_path)) as writer:
+        for seed in range(12, 18):
+            rng = random.Random(seed)
+            states = [GameStateDivercite.initial_state(players)]
+            while not states[-1].is_done():
+                states.append(states[-1].apply_move(rng.choice(states[-1].get_possible_moves())))
+            for row in encode_game(states, [player.get_id() for player in players], seed):
+                writer.append(row)
+    weights = texel(HeuristicWeights(), DEFAULT_PLAYER, load_positions([str(tmp_path)]), iterations=1)
+    assert all(value >= 0 for value in weights.to_vector())
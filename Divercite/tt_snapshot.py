@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple
+
+# A snapshot is a header followed by a hash table of entries with linear probing, at most half full:
+#   header: magic, format version, checksum of the evaluation (20 bytes), number of slots (a power of 2)
+#   entry: key (0 for an empty slot), scores of the players in playing order, depth, flag, best move
+#          (NO_MOVE if none), value and heuristic of the leaf, see the search of 2000.py
+MAGIC = b"DIVERTT\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sI20sQ")
+ENTRY = struct.Struct("<QhhbbHdd")
+NO_MOVE = 0xFFFF
+
+# Xored with the Zobrist key of a state, the evaluations of a state differ for each side
+SIDE_KEYS = {"W": 0, "B": 0x9E3779B97F4A7C15}
+
+# (depth, flag, value, leaf heuristic, best move)
+Entry = Tuple[int, int, float, float, Optional[int]]
+
+
+def snapshot_key(zobrist: int, piece_type: str) -> int:
+    """
+    Return the key of a state in a snapshot, for the player of a given side.
+
+    Args:
+        zobrist (int): The Zobrist key of the state.
+        piece_type (str): The piece type of the searching player ("W" or "B").
+
+    Returns:
+        int: The key.
+    """
+    return zobrist ^ SIDE_KEYS[piece_type]
+
+
+class TTSnapshot:
+    """
+    Read-only transposition table mapped from a file written by `TTSnapshot.write`, probed after the table
+    of the current game. Only the entries read are loaded.
+
+    Attributes:
+        path (str): The snapshot file.
+        slots (int): The number of slots of the table.
+    """
+
+    def __init__(self, path: str, mapped: mmap.mmap, slots: int) -> None:
+        self.path = path
+        self.slots = slots
+        self._map = mapped
+        self._mask = slots - 1
+
+    @classmethod
+    def open(cls, path: str, checksum: bytes) -> Optional[TTSnapshot]:
+        """
+        Map a snapshot.
+
+        Args:
+            path (str): The snapshot file.
+            checksum (bytes): The checksum of the evaluation of the player.
+
+        Returns:
+            Optional[TTSnapshot]: The snapshot, None if the file does not exist or was written by another format
+                or another evaluation.
+        """
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < HEADER.size:
+            mapped.close()
+            return None
+        magic, version, file_checksum, slots = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != FORMAT_VERSION or file_checksum != checksum \
+                or len(mapped) != HEADER.size + slots * ENTRY.size:
+            mapped.close()
+            return None
+        return cls(path, mapped, slots)
+
+    def probe(self, key: int, scores: Tuple[int, int]) -> Optional[Entry]:
+        """
+        Return the entry of a state.
+
+        Args:
+            key (int): The key of the state, see snapshot_key.
+            scores (Tuple[int, int]): The scores of the players in playing order.
+
+        Returns:
+            Optional[Entry]: The entry, None if the state is not in the snapshot.
+        """
+        i = key & self._mask
+        while True:
+            slot_key, score_1, score_2, depth, flag, best_move, value, he = ENTRY.unpack_from(self._map, HEADER.size + i * ENTRY.size)
+            if slot_key == 0:
+                return None
+            if slot_key == key and (score_1, score_2) == scores:
+                return depth, flag, value, he, None if best_move == NO_MOVE else best_move
+            i = (i + 1) & self._mask
+
+    def entries(self) -> Iterator[Tuple[Tuple[int, Tuple[int, int]], Entry]]:
+        """
+        Iterate over the entries of the snapshot.
+
+        Returns:
+            Iterator[Tuple[Tuple[int, Tuple[int, int]], Entry]]: The keys with the scores, and the entries.
+        """
+        for slot_key, score_1, score_2, depth, flag, best_move, value, he in ENTRY.iter_unpack(self._map[HEADER.size:]):
+            if slot_key != 0:
+                yield (slot_key, (score_1, score_2)), (depth, flag, value, he, None if best_move == NO_MOVE else best_move)
+
+    def close(self) -> None:
+        self._map.close()
+
+    @staticmethod
+    def write(path: str, checksum: bytes, entries: Dict[Tuple[int, Tuple[int, int]], Entry]) -> None:
+        """
+        Write a snapshot. The file is replaced at once, so the players mapping the previous one are not affected.
+
+        Args:
+            path (str): The snapshot file.
+            checksum (bytes): The checksum of the evaluation of the player.
+            entries (Dict[Tuple[int, Tuple[int, int]], Entry]): The entries, by key and scores.
+        """
+        slots = 1
+        while slots < 2 * len(entries) + 1:
+            slots *= 2
+        mask = slots - 1
+        table = bytearray(HEADER.size + slots * ENTRY.size)
+        HEADER.pack_into(table, 0, MAGIC, FORMAT_VERSION, checksum, slots)
+        for (key, (score_1, score_2)), (depth, flag, value, he, best_move) in entries.items():
+            if key == 0:
+                continue
+            i = key & mask
+            while struct.unpack_from("<Q", table, HEADER.size + i * ENTRY.size)[0] != 0:
+                i = (i + 1) & mask
+            ENTRY.pack_into(table, HEADER.size + i * ENTRY.size, key, score_1, score_2, depth, flag,
+                            NO_MOVE if best_move is None else best_move, value, he)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(table)
+        os.replace(tmp_path, path)
@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import os
+import random
+from argparse import RawTextHelpFormatter
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from game_state_divercite import GameStateDivercite
+from heuristic_weights import DEFAULT_WEIGHTS_PATH, HeuristicWeights
+from position_dataset import PositionDataset
+from self_play import game_points, load_player_class, play_game
+from shared_tt import SharedTranspositionTable
+
+DEFAULT_PLAYER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2000.py")
+
+
+def play_pair(job: Tuple[str, List[float], List[float], int, float, Optional[int], Optional[str]]) -> float:
+    """
+    Play two games between two weight vectors with the same seed, swapping colors.
+
+    Args:
+        job (Tuple[str, List[float], List[float], int, float, Optional[int], Optional[str]]): Player module,
+            weights of A, weights of B, seed, time limit of each player, node budget per move (None to search by
+            depth) and name of the shared transposition table (None for none).
+
+    Returns:
+        float: Points of A over the two games (between 0 and 2).
+    """
+    player_path, vector_a, vector_b, seed, time_limit, node_budget, shared_tt = job
+    player_class = load_player_class(player_path)
+    budget = {} if node_budget is None else {"node_budget": node_budget}
+    if shared_tt is not None:
+        budget["shared_tt"] = shared_tt
+    points = 0.
+    for a_first in (True, False):
+        random.seed(seed)
+        player_a = player_class("W" if a_first else "B", name="tuned_a", weights=HeuristicWeights.from_vector(vector_a), **budget)
+        player_b = player_class("B" if a_first else "W", name="tuned_b", weights=HeuristicWeights.from_vector(vector_b), **budget)
+        state = play_game(*((player_a, player_b) if a_first else (player_b, player_a)), time_limit=time_limit)
+        points += game_points(state, player_a)
+    return points
+
+
+def spsa(weights: HeuristicWeights, player_path: str, iterations: int, pairs: int, processes: int,
+         time_limit: float, node_budget: Optional[int] = None, shared_tt_entries: Optional[int] = None,
+         a: float = 0.01, c: float = 0.1) -> HeuristicWeights:
+    """
+    Tune the weights with SPSA: at each iteration, every weight is perturbed up or down at random and the
+    two perturbed players play each other. The match result estimates the gradient along the perturbation.
+
+    Perturbations and steps are relative to the magnitude of each initial weight.
+
+    Args:
+        weights (HeuristicWeights): The initial weights.
+        player_path (str): The player module accepting a `weights` argument.
+        iterations (int): The number of SPSA iterations.
+        pairs (int): The number of game pairs played at each iteration.
+        processes (int): The number of games played in parallel.
+        time_limit (float): Time credit of each player in (s), 2000.py searches at depth 3 below 100s.
+        node_budget (Optional[int], optional): Nodes searched per move, for games that do not depend on the machine.
+        shared_tt_entries (Optional[int], optional): If given, the size of a transposition table shared by the
+            games played in parallel (the players of the same weights share their entries).
+        a (float, optional): Step gain.
+        c (float, optional): Perturbation gain.
+
+    Returns:
+        HeuristicWeights: The tuned weights.
+    """
+    theta = weights.to_vector()
+    scales = [max(abs(x), 0.1) for x in theta]
+    shared_tt = SharedTranspositionTable.create(shared_tt_entries) if shared_tt_entries is not None else None
+    with Pool(processes) as pool:
+        for k in range(iterations):
+            a_k = a / (k + 1 + iterations / 10) ** 0.602
+            c_k = c / (k + 1) ** 0.101
+            delta = [random.choice((-1, 1)) for _ in theta]
+            theta_plus = [max(0., x + c_k * d * s) for x, d, s in zip(theta, delta, scales)]
+            theta_minus = [max(0., x - c_k * d * s) for x, d, s in zip(theta, delta, scales)]
+            seeds = [random.getrandbits(32) for _ in range(pairs)]
+            points = sum(pool.map(play_pair, [(player_path, theta_plus, theta_minus, seed, time_limit, node_budget,
+                                               shared_tt and shared_tt.name) for seed in seeds]))
+            # y+ - y- from the point of view of theta_plus, in [-1, 1]
+            diff = (2 * points - 2 * pairs) / (2 * pairs)
+            theta = [max(0., x + a_k * s * diff / (2 * c_k * d)) for x, d, s in zip(theta, delta, scales)]
+            print(f"SPSA iteration {k+1}/{iterations}: score of theta+ {points}/{2*pairs}, theta = {theta}")
+    if shared_tt is not None:
+        shared_tt.close()
+    return HeuristicWeights.from_vector(theta)
+
+
+def load_positions(paths: List[str]) -> List[Tuple[GameStateDivercite, int, int, float]]:
+    """
+    Load the positions of games recorded with `-r` (StateRecorder json files) or of position datasets
+    (directories written by position_dataset.py).
+
+    Args:
+        paths (List[str]): The recorded games and datasets.
+
+    Returns:
+        List[Tuple[GameStateDivercite, int, int, float]]: For each position, the state, the id of the first player,
+            the id of the second player and the final result of the first player (1, 0.5 or 0).
+    """
+    positions = []
+    for path in paths:
+        if os.path.isdir(path):
+            dataset = PositionDataset(path)
+            outcomes = dataset.column("outcome")
+            positions.extend((dataset.to_state(i), 0, 1, outcomes[i]) for i in range(len(dataset)))
+            dataset.close()
+            continue
+        with open(path) as f:
+            steps = json.load(f)
+        ids = [int(p["id"]) if isinstance(p, dict) else int(p) for p in steps[0]["players"]]
+        final_scores = {int(k): v for k, v in steps[-1]["scores"].items()}
+        result = 0.5 if final_scores[ids[0]] == final_scores[ids[1]] else float(final_scores[ids[0]] > final_scores[ids[1]])
+        for step in steps:
+            positions.append((GameStateDivercite.from_json(json.dumps(step)), ids[0], ids[1], result))
+    return positions
+
+
+def sigmoid(x: float) -> float:
+    """
+    Return the logistic function of x, without overflowing when the exponential of -x is out of range.
+
+    Args:
+        x (float): The value.
+
+    Returns:
+        float: 1 / (1 + exp(-x)), between 0 and 1.
+    """
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1 + z)
+
+
+def texel(weights: HeuristicWeights, player_path: str, positions: List[Tuple[GameStateDivercite, int, int, float]],
+          iterations: int, step: float = 0.05) -> HeuristicWeights:
+    """
+    Tune the weights read by the state heuristic with a logistic regression of the game results on the
+    evaluation of recorded positions (Texel method): the scale of the sigmoid is fitted first, then each
+    weight is moved up or down by a relative step as long as the mean squared error decreases.
+
+    Args:
+        weights (HeuristicWeights): The initial weights.
+        player_path (str): The player module accepting a `weights` argument.
+        positions (List[Tuple[GameStateDivercite, int, int, float]]): The positions given by `load_positions`.
+        iterations (int): The maximal number of passes over the weights.
+        step (float, optional): Relative step of each move.
+
+    Returns:
+        HeuristicWeights: The tuned weights.
+    """
+    player_class = load_player_class(player_path)
+
+    def error(w: HeuristicWeights, k: float) -> float:
+        evaluator = player_class("W", name="texel", weights=w)
+        total = 0.
+        for state, player_id, opponent_id, result in positions:
+            evaluator.id, evaluator.opponent_id = player_id, opponent_id
+            total += (result - sigmoid(k * evaluator.state_heuristic(state))) ** 2
+        return total / len(positions)
+
+    k = min((0.01 * 1.25 ** i for i in range(40)), key=lambda x: error(weights, x))
+    best_error = error(weights, k)
+    print(f"Texel: K = {k:.2f}, initial error {best_error:.6f}")
+    for it in range(iterations):
+        improved = False
+        for name in HeuristicWeights.STATIC_FIELDS:
+            value = getattr(weights, name)
+            for candidate in (value * (1 + step), value * (1 - step)):
+                trial = HeuristicWeights(**{**weights.to_json(), name: candidate})
+                trial_error = error(trial, k)
+                if trial_error < best_error:
+                    weights, best_error, improved = trial, trial_error, True
+                    break
+        print(f"Texel pass {it+1}/{iterations}: error {best_error:.6f}, weights = {weights}")
+        if not improved:
+            break
+    return weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                        prog="tune_weights.py",
+                        description="Tunes the heuristic weights of 2000.py and writes them to the config file loaded by the player.",
+                        formatter_class=RawTextHelpFormatter)
+    parser.add_argument("method", choices=["spsa", "texel"],
+                        help="\nThe tuning method.\n"
+                             +" - spsa: SPSA over parallel self-play games\n"
+                             +" - texel: logistic regression over positions of games recorded with -r or of position datasets\n\n")
+    parser.add_argument("games", nargs="*", help="The recorded games (json) or position datasets used by texel.\n\n")
+    parser.add_argument("--player", default=DEFAULT_PLAYER, help="The player module to tune.\n\n")
+    parser.add_argument("-i", "--iterations", type=int, default=50, help="The number of iterations.\n\n")
+    parser.add_argument("--pairs", type=int, default=4, help="The number of game pairs per SPSA iteration.\n\n")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="The number of games played in parallel.\n\n")
+    parser.add_argument("--time-limit", type=float, default=60, help="Time credit of each player in self-play games (s).\n\n")
+    parser.add_argument("--nodes", type=int, default=None, help="Node budget per move in self-play games, instead of the time limit.\n\n")
+    parser.add_argument("--shared-tt", type=int, default=None, help="Size (entries) of a transposition table shared by the self-play games.\n\n")
+    parser.add_argument("--init", default=DEFAULT_WEIGHTS_PATH, help="The initial weights (defaults used if missing).\n\n")
+    parser.add_argument("-o", "--output", default=DEFAULT_WEIGHTS_PATH, help="Where to write the tuned weights.")
+    args = parser.parse_args()
+
+    initial_weights = HeuristicWeights.load(args.init)
+    if args.method == "spsa":
+        tuned = spsa(initial_weights, args.player, args.iterations, args.pairs, args.processes, args.time_limit, args.nodes, args.shared_tt)
+    else:
+        tuned = texel(initial_weights, args.player, load_positions(args.games), args.iterations)
+    tuned.save(args.output)
+    print(f"Tuned weights written to {args.output}")